@@ -0,0 +1,43 @@
+"""Add employee listing indexes
+
+Revision ID: 3e7b1d9c5a48
+Revises: 9a41f0c7d2e6
+Create Date: 2026-10-18 14:05:12.604218
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3e7b1d9c5a48'
+down_revision: Union[str, Sequence[str], None] = '9a41f0c7d2e6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Build the indexes without blocking registrations on a live users table
+    with op.get_context().autocommit_block():
+        op.create_index('ix_users_user_role_id', 'users', ['user_role', 'id'], unique=False,
+                        postgresql_concurrently=True)
+        op.create_index('ix_users_lower_full_name_pattern', 'users',
+                        [sa.text('lower(full_name) text_pattern_ops')], unique=False,
+                        postgresql_concurrently=True)
+        op.create_index('ix_users_lower_email_pattern', 'users',
+                        [sa.text('lower(email) text_pattern_ops')], unique=False,
+                        postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_users_lower_email_pattern', table_name='users',
+                      postgresql_concurrently=True)
+        op.drop_index('ix_users_lower_full_name_pattern', table_name='users',
+                      postgresql_concurrently=True)
+        op.drop_index('ix_users_user_role_id', table_name='users',
+                      postgresql_concurrently=True)
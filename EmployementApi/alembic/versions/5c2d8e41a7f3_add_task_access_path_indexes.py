@@ -0,0 +1,57 @@
+"""Add task access path indexes
+
+Revision ID: 5c2d8e41a7f3
+Revises: 8bed8ac00d9f
+Create Date: 2026-10-18 10:12:40.318204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5c2d8e41a7f3'
+down_revision: Union[str, Sequence[str], None] = '8bed8ac00d9f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Partial indexes below match "is_deleted = false", so legacy NULLs must become false
+    op.execute("UPDATE tasks SET is_deleted = false WHERE is_deleted IS NULL")
+    op.alter_column('tasks', 'is_deleted', server_default=sa.false())
+    # Build the indexes without blocking writes on a live tasks table
+    with op.get_context().autocommit_block():
+        op.create_index('ix_tasks_assigned_to_is_deleted_status', 'tasks',
+                        ['assigned_to', 'is_deleted', 'status'], unique=False,
+                        postgresql_concurrently=True)
+        op.create_index('ix_tasks_assigned_by_is_deleted', 'tasks',
+                        ['assigned_by', 'is_deleted'], unique=False,
+                        postgresql_concurrently=True)
+        op.create_index('ix_tasks_active_id', 'tasks', ['id'], unique=False,
+                        postgresql_where=sa.text('is_deleted = false'),
+                        postgresql_concurrently=True)
+        op.create_index('ix_tasks_active_due_date', 'tasks', ['due_date'], unique=False,
+                        postgresql_where=sa.text('is_deleted = false'),
+                        postgresql_concurrently=True)
+        op.create_index('ix_tasks_modified_at_id', 'tasks', ['modified_at', 'id'], unique=False,
+                        postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_tasks_modified_at_id', table_name='tasks',
+                      postgresql_concurrently=True)
+        op.drop_index('ix_tasks_active_due_date', table_name='tasks',
+                      postgresql_concurrently=True)
+        op.drop_index('ix_tasks_active_id', table_name='tasks',
+                      postgresql_concurrently=True)
+        op.drop_index('ix_tasks_assigned_by_is_deleted', table_name='tasks',
+                      postgresql_concurrently=True)
+        op.drop_index('ix_tasks_assigned_to_is_deleted_status', table_name='tasks',
+                      postgresql_concurrently=True)
+    op.alter_column('tasks', 'is_deleted', server_default=None)
@@ -0,0 +1,36 @@
+"""Draw employee_id from a sequence
+
+Revision ID: 9a41f0c7d2e6
+Revises: 5c2d8e41a7f3
+Create Date: 2026-10-18 11:02:17.640519
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9a41f0c7d2e6'
+down_revision: Union[str, Sequence[str], None] = '5c2d8e41a7f3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute(sa.schema.CreateSequence(sa.Sequence('users_employee_id_seq', start=10000)))
+    # Continue after the highest id handed out by the old ORDER BY id DESC + 1 scheme
+    op.execute(
+        "SELECT setval('users_employee_id_seq', "
+        "COALESCE((SELECT MAX(employee_id) FROM users), 9999) + 1, false)")
+    op.execute("ALTER SEQUENCE users_employee_id_seq OWNED BY users.employee_id")
+    op.alter_column('users', 'employee_id',
+                    server_default=sa.text("nextval('users_employee_id_seq')"))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.alter_column('users', 'employee_id', server_default=None)
+    op.execute(sa.schema.DropSequence(sa.Sequence('users_employee_id_seq')))
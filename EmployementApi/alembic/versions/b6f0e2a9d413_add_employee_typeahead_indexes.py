@@ -0,0 +1,62 @@
+"""Add employee typeahead indexes
+
+Revision ID: b6f0e2a9d413
+Revises: 3e7b1d9c5a48
+Create Date: 2026-10-18 15:21:47.118305
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b6f0e2a9d413'
+down_revision: Union[str, Sequence[str], None] = '3e7b1d9c5a48'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    # Build the indexes without blocking registrations on a live users table
+    with op.get_context().autocommit_block():
+        # "C" collation indexes also return prefix matches in order, they replace the
+        # text_pattern_ops ones
+        op.create_index('ix_users_lower_full_name_c', 'users',
+                        [sa.text('lower(full_name) COLLATE "C"'), 'id'], unique=False,
+                        postgresql_concurrently=True)
+        op.create_index('ix_users_lower_email_c', 'users',
+                        [sa.text('lower(email) COLLATE "C"'), 'id'], unique=False,
+                        postgresql_concurrently=True)
+        op.drop_index('ix_users_lower_full_name_pattern', table_name='users',
+                      postgresql_concurrently=True)
+        op.drop_index('ix_users_lower_email_pattern', table_name='users',
+                      postgresql_concurrently=True)
+        op.create_index('ix_users_lower_full_name_trgm', 'users',
+                        [sa.text('lower(full_name) gist_trgm_ops')], unique=False,
+                        postgresql_using='gist', postgresql_concurrently=True)
+        op.create_index('ix_users_lower_email_trgm', 'users',
+                        [sa.text('lower(email) gist_trgm_ops')], unique=False,
+                        postgresql_using='gist', postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_users_lower_email_trgm', table_name='users',
+                      postgresql_concurrently=True)
+        op.drop_index('ix_users_lower_full_name_trgm', table_name='users',
+                      postgresql_concurrently=True)
+        op.create_index('ix_users_lower_full_name_pattern', 'users',
+                        [sa.text('lower(full_name) text_pattern_ops')], unique=False,
+                        postgresql_concurrently=True)
+        op.create_index('ix_users_lower_email_pattern', 'users',
+                        [sa.text('lower(email) text_pattern_ops')], unique=False,
+                        postgresql_concurrently=True)
+        op.drop_index('ix_users_lower_email_c', table_name='users',
+                      postgresql_concurrently=True)
+        op.drop_index('ix_users_lower_full_name_c', table_name='users',
+                      postgresql_concurrently=True)
@@ -1,9 +1,12 @@
 """This file contains the dependency for database session management in the Employment API."""
-from fastapi import HTTPException, status, Request
+from fastapi import Depends, HTTPException, status, Request
 from sqlalchemy.orm import Session
-from app.core.jwt_handle import decode_access_token
+from app.core.jwt_handle import verify_access_token
+from app.core.revocation import token_denylist
 from app.crud import auth as crud_auth
+from app.models.enums import UserRoleNumber
 from app.db.session import SessionLocal
+from app.schemas.user import Principal
 
 # Uncomment if you want to use OAuth2PasswordBearer for token-based authentication
 # from fastapi.security import OAuth2PasswordBearer
@@ -28,7 +31,7 @@ def get_db():
         db.close()
 
 
-def require_login(request: Request):
+async def require_login(request: Request):
     """Dependency to require a valid JWT token from either cookies or Authorization header."""
     # 1. Try to get JWT from cookie (for browser-based clients like web apps)
     jwt_token = request.cookies.get("jwt")
@@ -42,21 +45,65 @@ def require_login(request: Request):
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Not authenticated (no JWT found in cookie or header)",
         )
-    payload = decode_access_token(jwt_token)
+    payload = verify_access_token(jwt_token)
     if payload is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid or expired token",
         )
+    if token_denylist.is_revoked(payload):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Token has been revoked",
+        )
     return payload
 
 
-def get_current_user_from_payload(db: Session, payload: dict):
-    """Extract the user ID from the decoded JWT payload."""
+def require_admin_token(payload: dict = Depends(require_login)):
+    """Dependency rejecting every token but an admin's, checked on the token claims."""
+    if payload.get("role") != UserRoleNumber.ADMIN.value:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin access required",
+        )
+    return payload
+
+
+def get_current_user_from_payload(db: Session, payload: dict) -> Principal:
+    """Read the current role and status of the user of a decoded JWT payload."""
+    user_id = payload.get("uid")
     email = payload.get("sub")
-    if not email:
+    if user_id is None and not email:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid token payload: 'sub' not found",
         )
-    return crud_auth.get_user_by_email(db=db, email=email)
+    return crud_auth.get_principal(db=db, user_id=user_id, email=email)
+
+
+def require_fresh_user(payload: dict = Depends(require_login), db: Session = Depends(get_db)):
+    """Dependency resolving the current user from the database, for sensitive operations.
+
+    Role and active status come from crud.auth.user_cache, so a demoted or deactivated
+    user loses access once the change invalidates the entry, or its TTL runs out.
+    """
+    try:
+        return get_current_user_from_payload(db=db, payload=payload)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail=str(e),
+        ) from e
+
+
+def require_user(payload: dict = Depends(require_login), db: Session = Depends(get_db)):
+    """Dependency building the current user straight from the token claims.
+
+    Tokens issued before the claims were added have no ``uid`` and are resolved
+    from the database instead.
+    """
+    user_id = payload.get("uid")
+    email = payload.get("sub")
+    if user_id is None or not email:
+        return require_fresh_user(payload=payload, db=db)
+    return Principal(id=user_id, email=email, user_role=payload.get("role"))
@@ -0,0 +1,47 @@
+"""Dependencies for the async request path, only imported when USE_ASYNC_DB is enabled."""
+from fastapi import Depends, HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.api.deps import require_login
+from app.crud import auth_async as crud_auth_async
+from app.db.session import AsyncSessionLocal
+from app.schemas.user import Principal
+
+
+async def get_async_db():
+    """Dependency to get an async database session."""
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+async def get_current_user_from_payload(db: AsyncSession, payload: dict) -> Principal:
+    """Read the current role and status of the user of a decoded JWT payload, see deps."""
+    user_id = payload.get("uid")
+    email = payload.get("sub")
+    if user_id is None and not email:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid token payload: 'sub' not found",
+        )
+    return await crud_auth_async.get_principal(db=db, user_id=user_id, email=email)
+
+
+async def require_fresh_user(payload: dict = Depends(require_login),
+                             db: AsyncSession = Depends(get_async_db)):
+    """Dependency resolving the current user from the database, for sensitive operations."""
+    try:
+        return await get_current_user_from_payload(db=db, payload=payload)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail=str(e),
+        ) from e
+
+
+async def require_user(payload: dict = Depends(require_login),
+                       db: AsyncSession = Depends(get_async_db)):
+    """Dependency building the current user from the token claims, see deps.require_user."""
+    user_id = payload.get("uid")
+    email = payload.get("sub")
+    if user_id is None or not email:
+        return await require_fresh_user(payload=payload, db=db)
+    return Principal(id=user_id, email=email, user_role=payload.get("role"))
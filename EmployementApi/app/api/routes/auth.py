@@ -1,15 +1,26 @@
 """Authentication routes for the Employment API."""
-from fastapi import APIRouter, Depends, HTTPException, status, Request, Header
-from fastapi.responses import JSONResponse
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, status, Request, Header, Query
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, StreamingResponse
 from pydantic import BaseModel
 from sqlalchemy.orm import Session
 
 from app.api import deps
 from app.api.deps import get_db, require_login
-from app.schemas.user import RefreshRequest, UserCreate, UserOut, UserLogin
+from app.schemas.user import (Principal, RefreshRequest, UserCreate, UserImportReport, UserOut,
+                              UserLogin)
 from app.crud import auth as crud_auth
+from app.crud import employee_search
+from app.crud import export as crud_export
+from app.crud import revocation as crud_revocation
+from app.crud import user_import
 from app.core.jwt_handle import decode_access_token, create_access_token
-from app.models.enums import TokenType, SameSite, get_user_role_text
+from app.core.revocation import token_denylist
+from app.core.responses import ModelResponse
+from app.core.security import PasswordHashingBusyError
+from app.core.throttle import LoginThrottledError, login_throttle
+from app.models.enums import TokenType, SameSite, UserRoleNumber, get_user_role_text
 
 router = APIRouter()
 
@@ -48,6 +59,8 @@ class EmployeeResponse(BaseModel):
     success: bool
     message: str
     employee: list[UserOut]
+    # Opaque token for the next page, None when this is the last page
+    next_cursor: Optional[str] = None
 
 
 @router.post("/register", response_model=RegisterResponse)
@@ -60,6 +73,11 @@ def register_user(user_in: UserCreate, db: Session = Depends(get_db)):
             message="User registered successfully.",
             user=user
         )
+    except PasswordHashingBusyError as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e),
+            headers={"Retry-After": "1"}) from e
     except ValueError as e:
         # Custom error (e.g., user already exists)
         raise HTTPException(status_code=400, detail=str(e)) from e
@@ -69,48 +87,80 @@ def register_user(user_in: UserCreate, db: Session = Depends(get_db)):
             status_code=500, detail="Internal server error") from e
 
 
+def build_login_response(logged_in_user, x_use_token: str):
+    """Return the tokens in the body (mobile/API) or as cookies (browsers)."""
+    # If X-Use-Token header is present and true, return tokens in body (for mobile/API)
+    if x_use_token and x_use_token.lower() == "true":
+        return {
+            "success": True,
+            "message": "User logged in successfully.",
+            "jwt": logged_in_user.jwt,
+            "refresh_token": logged_in_user.refresh_token
+        }
+    # Otherwise, set tokens as cookies (for browsers)
+    response = JSONResponse(
+        content={
+            "success": True,
+            "message": "User logged in successfully."
+        }
+    )
+    # Set JWT as HttpOnly cookie
+    response.set_cookie(
+        key=TokenType.JWT.value,
+        value=logged_in_user.jwt,
+        httponly=False,
+        secure=False,  # Set to True in production (HTTPS)
+        samesite=SameSite.LAX.value
+    )
+    # Set Refresh Token as HttpOnly cookie
+    response.set_cookie(
+        key=TokenType.REFRESH.value,
+        value=logged_in_user.refresh_token,
+        httponly=False,
+        secure=False,  # Set to True in production (HTTPS)
+        samesite=SameSite.LAX.value  # Use None for cross-site cookies
+    )
+    return response
+
+
+def throttled_error(error: LoginThrottledError) -> HTTPException:
+    """Build the 429 answered to a throttled login attempt."""
+    return HTTPException(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        detail=str(error),
+        headers={"Retry-After": error.retry_after_header()})
+
+
+def get_client_ip(request: Request) -> Optional[str]:
+    """Return the client IP, the proxy's unless the server trusts its forwarded headers."""
+    return request.client.host if request.client else None
+
+
 @router.post("/login", response_model=LoginResponse)
 def login_user(
+    request: Request,
     login_data: UserLogin,
     db: Session = Depends(get_db),
     # Set the X-Use-Token: true
     x_use_token: str = Header(default=None, alias="X-Use-Token")
 ):
-    """Login user endpoint (to be implemented)."""
+    """Login user endpoint, throttled per client IP and username before any hashing."""
+    try:
+        login_throttle.check(get_client_ip(request), login_data.username)
+    except LoginThrottledError as e:
+        raise throttled_error(e) from e
     try:
         logged_in_user = crud_auth.login_user(db=db, login_data=login_data)
-        # If X-Use-Token header is present and true, return tokens in body (for mobile/API)
-        if x_use_token and x_use_token.lower() == "true":
-            return {
-                "success": True,
-                "message": "User logged in successfully.",
-                "jwt": logged_in_user.jwt,
-                "refresh_token": logged_in_user.refresh_token
-            }
-        # Otherwise, set tokens as cookies (for browsers)
-        response = JSONResponse(
-            content={
-                "success": True,
-                "message": "User logged in successfully."
-            }
-        )
-        # Set JWT as HttpOnly cookie
-        response.set_cookie(
-            key=TokenType.JWT.value,
-            value=logged_in_user.jwt,
-            httponly=False,
-            secure=False,  # Set to True in production (HTTPS)
-            samesite=SameSite.LAX.value
-        )
-        # Set Refresh Token as HttpOnly cookie
-        response.set_cookie(
-            key=TokenType.REFRESH.value,
-            value=logged_in_user.refresh_token,
-            httponly=False,
-            secure=False,  # Set to True in production (HTTPS)
-            samesite=SameSite.LAX.value  # Use None for cross-site cookies
-        )
-        return response
+        login_throttle.record_success(login_data.username)
+        return build_login_response(logged_in_user, x_use_token)
+    except PasswordHashingBusyError as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e),
+            headers={"Retry-After": "1"}) from e
+    except crud_auth.InvalidCredentialsError as e:
+        login_throttle.record_failure(login_data.username)
+        raise HTTPException(status_code=400, detail=str(e)) from e
     except ValueError as e:
         # Custom error (e.g., user already exists)
         raise HTTPException(status_code=400, detail=str(e)) from e
@@ -155,7 +205,13 @@ def refresh_token(
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid refresh token"
         )
-    new_access_token = create_access_token({"sub": payload["sub"]})
+    if token_denylist.is_revoked(payload):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED, detail="Refresh token has been revoked"
+        )
+    # Carry the identity claims over so the new token also resolves without a DB query
+    new_access_token = create_access_token(
+        {key: payload[key] for key in ("sub", "uid", "role", "ver") if key in payload})
 
     if x_use_token and x_use_token.lower() == "true":
         return {
@@ -176,32 +232,71 @@ def refresh_token(
     return response
 
 
+def clear_auth_cookies(response: JSONResponse):
+    """Expire the JWT and refresh token cookies of a browser client."""
+    for key in (TokenType.JWT.value, TokenType.REFRESH.value):
+        response.set_cookie(
+            key=key,
+            value="",
+            httponly=True,
+            secure=False,  # Set to True in production
+            samesite=SameSite.LAX.value,
+            max_age=0
+        )
+
+
+def get_request_tokens(request: Request, body: Optional[RefreshRequest]) -> list[str]:
+    """Collect the tokens sent with a request, from cookies, the Bearer header or the body."""
+    tokens = [request.cookies.get(TokenType.JWT.value),
+              request.cookies.get(TokenType.REFRESH.value)]
+    auth_header = request.headers.get("Authorization")
+    if auth_header and auth_header.startswith("Bearer "):
+        tokens.append(auth_header.split(" ", 1)[1])
+    if body and body.refresh_token:
+        tokens.append(body.refresh_token)
+    return [token for token in tokens if token]
+
+
 @router.post("/logout")
-def logout(x_use_token: str = Header(default=None, alias="X-Use-Token")):
+def logout(
+    request: Request,
+    x_use_token: str = Header(default=None, alias="X-Use-Token"),
+    body: RefreshRequest = None,
+    db: Session = Depends(get_db)
+):
     """
-    Logout user by clearing cookies (browser) or just returning success (mobile/API).
+    Logout user by revoking the tokens sent with the request (cookies, Bearer header
+    or "refresh_token" in the body) and clearing cookies (browser).
     """
+    for token in get_request_tokens(request, body):
+        payload = decode_access_token(token)
+        if payload is not None:
+            crud_revocation.revoke_token(db, payload)
     response = JSONResponse(
         content={"success": True, "message": "Logged out successfully."}
     )
     # Only clear cookies for browser clients
     if not (x_use_token and x_use_token.lower() == "true"):
-        response.set_cookie(
-            key=TokenType.JWT.value,
-            value="",
-            httponly=True,
-            secure=False,  # Set to True in production
-            samesite=SameSite.LAX.value,
-            max_age=0
-        )
-        response.set_cookie(
-            key=TokenType.REFRESH.value,
-            value="",
-            httponly=True,
-            secure=False,  # Set to True in production
-            samesite=SameSite.LAX.value,
-            max_age=0
-        )
+        clear_auth_cookies(response)
+    return response
+
+
+@router.post("/logout_all")
+def logout_all(
+    x_use_token: str = Header(default=None, alias="X-Use-Token"),
+    db: Session = Depends(get_db),
+    logged_in_user: Principal = Depends(deps.require_user)
+):
+    """Logout user from every device by revoking all the tokens issued to them so far."""
+    try:
+        crud_revocation.revoke_user_tokens(db, logged_in_user.id)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e)) from e
+    response = JSONResponse(
+        content={"success": True, "message": "Logged out from all devices."}
+    )
+    if not (x_use_token and x_use_token.lower() == "true"):
+        clear_auth_cookies(response)
     return response
 
 
@@ -212,26 +307,91 @@ def protected_route(current_user=Depends(require_login)):
     return {"msg": "You are authenticated!", "user": current_user}
 
 
-@router.get("/get_user_role")
-def get_user_role(db: Session = Depends(deps.get_db), current_user=Depends(deps.require_login)):
+@router.get("/get_user_role", response_model=RoleResponse)
+def get_user_role(logged_in_user: Principal = Depends(deps.require_user)):
     """Retrieve the role of the currently logged-in user."""
-    logged_in_user = deps.get_current_user_from_payload(
-        db=db, payload=current_user)
-
-    return RoleResponse(
+    return ModelResponse(RoleResponse(
         success=True,
         message="User role retrieved successfully.",
         role=get_user_role_text(
             logged_in_user.user_role) if logged_in_user.user_role else "Unknown"
-    )
+    ))
 
 
-@router.get("/get_employees")
-def get_employees(db: Session = Depends(deps.get_db), current_user=Depends(deps.require_login)):
-    """Retrieve all the employees."""
-
-    return EmployeeResponse(
+@router.get("/get_employees", response_model=EmployeeResponse)
+def get_employees(limit: int = Query(default=100, ge=1, le=1000), cursor: Optional[str] = None,
+                  search: Optional[str] = None, db: Session = Depends(deps.get_db),
+                  current_user=Depends(deps.require_login)):
+    """Retrieve a page of employees, optionally by name or email prefix."""
+    try:
+        employees, next_cursor = crud_auth.get_all_employees(
+            db=db, limit=limit, cursor=cursor, search=search)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
+    return ModelResponse(EmployeeResponse(
         success=True,
         message="Employees retrieved successfully.",
-        employee=crud_auth.get_all_employees(db=db)
-    )
+        employee=employees,
+        next_cursor=next_cursor
+    ))
+
+
+@router.get("/employees/search", response_model=EmployeeResponse)
+def search_employees(q: str = Query(min_length=1, max_length=100),
+                     limit: int = Query(default=10, ge=1,
+                                        le=employee_search.EMPLOYEE_SEARCH_MAX_RESULTS),
+                     db: Session = Depends(deps.get_db),
+                     current_user=Depends(deps.require_login)):
+    """Typeahead search of employees by name or email, best matches first."""
+    return ModelResponse(EmployeeResponse(
+        success=True,
+        message="Employees retrieved successfully.",
+        employee=employee_search.search_employees(db, q, limit)
+    ))
+
+
+@router.get("/export_employees")
+def export_employees(file_format: str = Query(default="ndjson", alias="format"),
+                     db: Session = Depends(deps.get_db),
+                     current_user=Depends(deps.require_login)):
+    """Stream every employee as NDJSON or CSV, in constant memory."""
+    try:
+        media_type = crud_export.get_media_type(file_format)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
+    return StreamingResponse(
+        crud_export.export_rows(db, crud_export.build_employee_export_query(), file_format),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="employees.{file_format}"'})
+
+
+def require_admin(logged_in_user: Principal):
+    """Reject the request unless the user is an admin."""
+    if logged_in_user.user_role != UserRoleNumber.ADMIN.value:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only admins can import employees")
+
+
+@router.post("/import_employees", response_model=UserImportReport)
+async def import_employees(
+    request: Request,
+    file_format: str = Query(default="csv", alias="format"),
+    db: Session = Depends(get_db),
+    # Role is re-read from the database, not trusted from the token
+    logged_in_user: Principal = Depends(deps.require_fresh_user)
+):
+    """
+    Import employees from a CSV (with a header row) or JSONL request body.
+    Rows are streamed and imported in chunks, the report lists every rejected row.
+    """
+    require_admin(logged_in_user)
+
+    async def run_chunk(rows, report, seen):
+        await run_in_threadpool(user_import.import_user_chunk, db, rows, report, seen)
+
+    try:
+        return await user_import.import_users_stream(request.stream(), file_format, run_chunk)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
+
@@ -0,0 +1,210 @@
+"""Async authentication routes, served instead of auth.py when USE_ASYNC_DB is enabled."""
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, status, Header, Query, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api import deps, deps_async
+from app.api.routes import auth
+from app.api.routes.auth import (EmployeeResponse, LoginResponse, RegisterResponse,
+                                 RoleResponse, build_login_response, clear_auth_cookies,
+                                 get_client_ip, get_request_tokens, require_admin,
+                                 throttled_error)
+from app.core.jwt_handle import decode_access_token
+from app.core.responses import ModelResponse
+from app.core.security import PasswordHashingBusyError
+from app.core.throttle import LoginThrottledError, login_throttle
+from app.crud import auth_async as crud_auth
+from app.crud import employee_search
+from app.crud import export as crud_export
+from app.crud import export_async
+from app.crud import revocation as crud_revocation
+from app.crud import user_import
+from app.models.enums import get_user_role_text
+from app.schemas.user import (Principal, RefreshRequest, UserCreate, UserImportReport,
+                              UserLogin)
+
+router = APIRouter()
+
+# Routes that never touch the database are shared with the sync stack
+router.add_api_route("/refresh", auth.refresh_token, methods=["POST"])
+router.add_api_route("/protected", auth.protected_route, methods=["GET"])
+
+
+@router.post("/register", response_model=RegisterResponse)
+async def register_user(user_in: UserCreate, db: AsyncSession = Depends(deps_async.get_async_db)):
+    """Register a new user."""
+    try:
+        user = await crud_auth.register_user(db=db, user_in=user_in)
+        return RegisterResponse(
+            success=True,
+            message="User registered successfully.",
+            user=user
+        )
+    except PasswordHashingBusyError as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e),
+            headers={"Retry-After": "1"}) from e
+    except ValueError as e:
+        # Custom error (e.g., user already exists)
+        raise HTTPException(status_code=400, detail=str(e)) from e
+    except Exception as e:
+        # General error
+        raise HTTPException(
+            status_code=500, detail="Internal server error") from e
+
+
+@router.post("/login", response_model=LoginResponse)
+async def login_user(
+    request: Request,
+    login_data: UserLogin,
+    db: AsyncSession = Depends(deps_async.get_async_db),
+    # Set the X-Use-Token: true
+    x_use_token: str = Header(default=None, alias="X-Use-Token")
+):
+    """Login user endpoint, throttled per client IP and username before any hashing."""
+    try:
+        await login_throttle.check_async(get_client_ip(request), login_data.username)
+    except LoginThrottledError as e:
+        raise throttled_error(e) from e
+    try:
+        logged_in_user = await crud_auth.login_user(db=db, login_data=login_data)
+        await login_throttle.record_success_async(login_data.username)
+        return build_login_response(logged_in_user, x_use_token)
+    except PasswordHashingBusyError as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e),
+            headers={"Retry-After": "1"}) from e
+    except crud_auth.InvalidCredentialsError as e:
+        await login_throttle.record_failure_async(login_data.username)
+        raise HTTPException(status_code=400, detail=str(e)) from e
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
+    except Exception as e:
+        # General error
+        raise HTTPException(
+            status_code=500, detail="Internal server error") from e
+
+
+@router.post("/logout")
+async def logout(
+    request: Request,
+    x_use_token: str = Header(default=None, alias="X-Use-Token"),
+    body: RefreshRequest = None,
+    db: AsyncSession = Depends(deps_async.get_async_db)
+):
+    """Logout user by revoking the tokens sent with the request, see auth.logout."""
+    for token in get_request_tokens(request, body):
+        payload = decode_access_token(token)
+        if payload is not None:
+            await db.run_sync(crud_revocation.revoke_token, payload)
+    response = JSONResponse(
+        content={"success": True, "message": "Logged out successfully."}
+    )
+    # Only clear cookies for browser clients
+    if not (x_use_token and x_use_token.lower() == "true"):
+        clear_auth_cookies(response)
+    return response
+
+
+@router.post("/logout_all")
+async def logout_all(
+    x_use_token: str = Header(default=None, alias="X-Use-Token"),
+    db: AsyncSession = Depends(deps_async.get_async_db),
+    logged_in_user: Principal = Depends(deps_async.require_user)
+):
+    """Logout user from every device by revoking all the tokens issued to them so far."""
+    try:
+        await db.run_sync(crud_revocation.revoke_user_tokens, logged_in_user.id)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e)) from e
+    response = JSONResponse(
+        content={"success": True, "message": "Logged out from all devices."}
+    )
+    if not (x_use_token and x_use_token.lower() == "true"):
+        clear_auth_cookies(response)
+    return response
+
+
+@router.get("/get_user_role", response_model=RoleResponse)
+async def get_user_role(logged_in_user: Principal = Depends(deps_async.require_user)):
+    """Retrieve the role of the currently logged-in user."""
+    return ModelResponse(RoleResponse(
+        success=True,
+        message="User role retrieved successfully.",
+        role=get_user_role_text(
+            logged_in_user.user_role) if logged_in_user.user_role else "Unknown"
+    ))
+
+
+@router.get("/get_employees", response_model=EmployeeResponse)
+async def get_employees(limit: int = Query(default=100, ge=1, le=1000),
+                        cursor: Optional[str] = None, search: Optional[str] = None,
+                        db: AsyncSession = Depends(deps_async.get_async_db),
+                        current_user=Depends(deps.require_login)):
+    """Retrieve a page of employees, optionally by name or email prefix."""
+    try:
+        employees, next_cursor = await crud_auth.get_all_employees(
+            db=db, limit=limit, cursor=cursor, search=search)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
+    return ModelResponse(EmployeeResponse(
+        success=True,
+        message="Employees retrieved successfully.",
+        employee=employees,
+        next_cursor=next_cursor
+    ))
+
+
+@router.get("/employees/search", response_model=EmployeeResponse)
+async def search_employees(q: str = Query(min_length=1, max_length=100),
+                           limit: int = Query(default=10, ge=1,
+                                              le=employee_search.EMPLOYEE_SEARCH_MAX_RESULTS),
+                           db: AsyncSession = Depends(deps_async.get_async_db),
+                           current_user=Depends(deps.require_login)):
+    """Typeahead search of employees by name or email, best matches first."""
+    return ModelResponse(EmployeeResponse(
+        success=True,
+        message="Employees retrieved successfully.",
+        employee=await crud_auth.search_employees(db, q, limit)
+    ))
+
+
+@router.get("/export_employees")
+async def export_employees(file_format: str = Query(default="ndjson", alias="format"),
+                           db: AsyncSession = Depends(deps_async.get_async_db),
+                           current_user=Depends(deps.require_login)):
+    """Stream every employee as NDJSON or CSV, in constant memory."""
+    try:
+        media_type = crud_export.get_media_type(file_format)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
+    return StreamingResponse(
+        export_async.export_rows(db, crud_export.build_employee_export_query(), file_format),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="employees.{file_format}"'})
+
+
+@router.post("/import_employees", response_model=UserImportReport)
+async def import_employees(
+    request: Request,
+    file_format: str = Query(default="csv", alias="format"),
+    db: AsyncSession = Depends(deps_async.get_async_db),
+    logged_in_user: Principal = Depends(deps_async.require_fresh_user)
+):
+    """Import employees from a CSV or JSONL request body, see auth.import_employees."""
+    require_admin(logged_in_user)
+
+    async def run_chunk(rows, report, seen):
+        # run_sync runs on the event loop, so the passwords are hashed before it
+        valid = user_import.validate_user_chunk(rows, report, seen)
+        hashed = await user_import.hash_user_chunk_async(valid)
+        await db.run_sync(user_import.insert_user_chunk, hashed, report)
+
+    try:
+        return await user_import.import_users_stream(request.stream(), file_format, run_chunk)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
+
@@ -0,0 +1,48 @@
+"""Internal routes exposing runtime metrics of the Employment API, to admins only."""
+from fastapi import APIRouter, Depends
+
+from app.api import deps
+from app.core.jwt_handle import token_cache
+from app.core.revocation import token_denylist
+from app.core.security import get_password_pool_stats
+from app.core.throttle import login_throttle
+from app.crud import auth as crud_auth
+from app.db.session import get_pool_stats
+
+router = APIRouter(dependencies=[Depends(deps.require_admin_token)])
+
+
+@router.get("/hash-pool")
+def hash_pool_stats():
+    """Report the load and queue depth of the password hashing pool."""
+    return get_password_pool_stats()
+
+
+@router.get("/login-throttle")
+def login_throttle_stats():
+    """Report allowed, rate limited and locked out login attempts of this worker."""
+    return login_throttle.stats()
+
+
+@router.get("/user-cache")
+def user_cache_stats():
+    """Report the hit, miss and eviction counters of the user principal cache."""
+    return crud_auth.user_cache.stats()
+
+
+@router.get("/token-cache")
+def token_cache_stats():
+    """Report the hit, miss and eviction counters of the verified token cache."""
+    return token_cache.stats()
+
+
+@router.get("/token-denylist")
+def token_denylist_stats():
+    """Report how many revoked tokens and users the denylist of this worker holds."""
+    return token_denylist.stats()
+
+
+@router.get("/db-pool")
+def db_pool_stats():
+    """Report checked-out connections, overflow and checkout wait times of the DB pool."""
+    return get_pool_stats()
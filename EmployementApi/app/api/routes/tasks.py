@@ -1,11 +1,22 @@
 """This module defines the API routes for managing tasks in the Employment API."""
-from typing import List
-from fastapi import APIRouter, HTTPException, status, Depends
+import math
+import time
+from datetime import datetime
+from typing import List, Optional
+from fastapi import APIRouter, HTTPException, Query, Request, status, Depends
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from sqlalchemy.orm import Session
 
 from app.api import deps
-from app.schemas.task import TaskCreate, TaskUpdate
+from app.core import http_cache
+from app.core.events import task_hub
+from app.core.revocation import token_denylist
+from app.core.responses import ModelResponse
+from app.schemas.task import (BulkTaskResult, TaskBulkCreate, TaskBulkDelete, TaskBulkUpdate,
+                              TaskCreate, TaskUpdate)
+from app.schemas.user import Principal
+from app.crud import export as crud_export
 from app.crud import task as crud_task
 
 router = APIRouter()
@@ -23,42 +34,182 @@ class TasksResponse(BaseModel):
     success: bool
     message: str
     tasks: List[TaskUpdate]
+    # Opaque token for the next page, None when this is the last page
+    next_cursor: Optional[str] = None
+
+
+class TaskChangesResponse(BaseModel):
+    """Response model for the task change feed."""
+    success: bool
+    message: str
+    tasks: List[TaskUpdate]
+    # Cursor to send as ``since`` on the next poll, None until a change has been seen
+    next_cursor: Optional[str] = None
+    # More changes are waiting, poll again right away
+    has_more: bool = False
+
+
+class BulkTasksResponse(BaseModel):
+    """Response model for bulk task operations, with one result per requested item."""
+    success: bool
+    message: str
+    results: List[BulkTaskResult]
+
+
+def task_page_response(tasks, next_cursor: Optional[str]):
+    """Render a page of TaskRow objects shaped like TasksResponse, without validating it."""
+    return ModelResponse({
+        "success": True,
+        "message": "Task read successfully",
+        "tasks": tasks,
+        "next_cursor": next_cursor
+    })
+
+
+def task_changes_response(tasks, next_cursor: Optional[str], has_more: bool):
+    """Render changed TaskRow objects shaped like TaskChangesResponse, without validating it."""
+    return ModelResponse({
+        "success": True,
+        "message": "Task changes read successfully",
+        "tasks": tasks,
+        "next_cursor": next_cursor,
+        "has_more": has_more
+    })
+
+
+def page_etag(request: Request, page_ids: tuple, last_modified) -> str:
+    """Build the ETag of a page of tasks from its query, ordered row ids and latest change.
+
+    Pages are revalidated with this ETag only: rows leaving a page do not move its
+    Last-Modified, so If-Modified-Since alone could answer a stale 304.
+    """
+    return http_cache.make_etag(request.url.path, request.url.query, page_ids, last_modified)
 
 
 @router.get("/read_tasks", response_model=TasksResponse)
-def read_tasks(skip: int = 0, limit: int = 100, db: Session = Depends(deps.get_db)):
-    """Retrieve a list of tasks with pagination."""
-    tasks = crud_task.get_tasks(db, skip=skip, limit=limit)
-    if tasks is None:
-        raise HTTPException(status_code=404, detail="Tasks are not found")
-    return TasksResponse(
-        success=True,
-        message="Task read successfully",
-        tasks=tasks
-    )
+def read_tasks(request: Request, skip: int = Query(default=0, ge=0),
+               limit: int = Query(default=100, ge=1, le=1000),
+               cursor: Optional[str] = None, db: Session = Depends(deps.get_db)):
+    """Retrieve a list of tasks with cursor or skip/limit pagination."""
+    try:
+        # Read before the page, so a change in between is never hidden behind this ETag
+        page_ids, last_modified = crud_task.get_tasks_version(
+            db, skip=skip, limit=limit, cursor=cursor)
+        etag = page_etag(request, page_ids, last_modified)
+        if http_cache.is_not_modified(request, etag, None):
+            return http_cache.not_modified_response(etag, last_modified)
+        tasks, next_cursor = crud_task.get_tasks(
+            db, skip=skip, limit=limit, cursor=cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
+    return http_cache.set_cache_headers(
+        task_page_response(tasks, next_cursor), etag, last_modified)
+
+
+@router.get("/filter_tasks", response_model=TasksResponse)
+def filter_tasks(request: Request, assigned_to: Optional[int] = None,
+                 assigned_by: Optional[int] = None, status: Optional[str] = None,
+                 priority: Optional[str] = None, due_from: Optional[datetime] = None,
+                 due_to: Optional[datetime] = None, include_deleted: bool = False,
+                 limit: int = Query(default=100, ge=1, le=1000),
+                 cursor: Optional[str] = None,
+                 db: Session = Depends(deps.get_db)):
+    """Retrieve a page of tasks filtered in SQL by assignee, status, priority and due date."""
+    filters = dict(assigned_to=assigned_to, assigned_by=assigned_by, status=status,
+                   priority=priority, due_from=due_from, due_to=due_to,
+                   include_deleted=include_deleted, limit=limit, cursor=cursor)
+    try:
+        page_ids, last_modified = crud_task.filter_tasks_version(db, **filters)
+        etag = page_etag(request, page_ids, last_modified)
+        if http_cache.is_not_modified(request, etag, None):
+            return http_cache.not_modified_response(etag, last_modified)
+        tasks, next_cursor = crud_task.filter_tasks(db, **filters)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
+    return http_cache.set_cache_headers(
+        task_page_response(tasks, next_cursor), etag, last_modified)
+
+
+@router.get("/changes", response_model=TaskChangesResponse)
+def read_task_changes(since: Optional[str] = None,
+                      limit: int = Query(default=100, ge=1, le=1000),
+                      db: Session = Depends(deps.get_db)):
+    """Retrieve the tasks created, updated or soft deleted since a change cursor."""
+    try:
+        tasks, next_cursor, has_more = crud_task.get_task_changes(
+            db, limit=limit, since=since)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
+    return task_changes_response(tasks, next_cursor, has_more)
+
+
+@router.get("/stream")
+async def stream_tasks(payload: dict = Depends(deps.require_login)):
+    """Push the tasks assigned to the current user as server-sent events when they change.
+
+    Events are "created", "updated" and "deleted" with the task as data, and "removed"
+    when a task is reassigned to someone else. "resync" means the client fell behind and
+    missed events; it should catch up through /changes. The stream ends once the token
+    is revoked or expires, checked on every keep-alive interval.
+    """
+    # Not require_user: its database session would stay open as long as the stream
+    user_id = payload.get("uid")
+    if user_id is None:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED,
+                            detail="Token has no user id, log in again to subscribe")
+
+    def token_still_valid() -> bool:
+        """Whether the subscriber's token is neither revoked nor expired."""
+        return not token_denylist.is_revoked(payload) and \
+            payload.get("exp", math.inf) > time.time()
+
+    return StreamingResponse(
+        task_hub.stream(user_id, token_still_valid), media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+
+@router.get("/export_tasks")
+def export_tasks(file_format: str = Query(default="ndjson", alias="format"),
+                 assigned_to: Optional[int] = None, assigned_by: Optional[int] = None,
+                 status: Optional[str] = None, priority: Optional[str] = None,
+                 due_from: Optional[datetime] = None, due_to: Optional[datetime] = None,
+                 include_deleted: bool = False, db: Session = Depends(deps.get_db),
+                 current_user=Depends(deps.require_login)):
+    """Stream every task matching the filters as NDJSON or CSV, in constant memory."""
+    try:
+        media_type = crud_export.get_media_type(file_format)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
+    stmt = crud_export.build_task_export_query(
+        assigned_to=assigned_to, assigned_by=assigned_by, status=status,
+        priority=priority, due_from=due_from, due_to=due_to,
+        include_deleted=include_deleted)
+    return StreamingResponse(
+        crud_export.export_rows(db, stmt, file_format), media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="tasks.{file_format}"'})
 
 
 @router.get("/read_task/{task_id}", response_model=TaskResponse)
-def read_task(task_id: int, db: Session = Depends(deps.get_db)):
+def read_task(request: Request, task_id: int, db: Session = Depends(deps.get_db)):
     """Retrieve a task by its ID."""
-    existing_task = crud_task.get_task(db, task_id=task_id)
+    existing_task, modified_at = crud_task.get_task(db, task_id=task_id)
     if existing_task is None:
         raise HTTPException(status_code=404, detail="Task not found")
-    return TaskResponse(
+    etag = http_cache.make_etag("task", task_id, modified_at)
+    if http_cache.is_not_modified(request, etag, modified_at):
+        return http_cache.not_modified_response(etag, modified_at)
+    return http_cache.set_cache_headers(ModelResponse(TaskResponse(
         success=True,
         message="Task read successfully",
         task=existing_task
-    )
+    )), etag, modified_at)
 
 
 @router.post("/create_task", response_model=TaskResponse, status_code=status.HTTP_201_CREATED)
 def create_task(task: TaskCreate, db: Session = Depends(deps.get_db),
-                current_user=Depends(deps.require_login)):
+                logged_in_user: Principal = Depends(deps.require_user)):
     """Create a new task."""
     try:
-        # Assuming current_user is a dict with user info
-        logged_in_user = deps.get_current_user_from_payload(
-            db=db, payload=current_user)
         # Set the user who created the task
         task.assigned_by = logged_in_user.id
         new_task = crud_task.create_task(db=db, task=task)
@@ -69,43 +220,77 @@ def create_task(task: TaskCreate, db: Session = Depends(deps.get_db),
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error creating task: {str(e)}"
         ) from e
-    return TaskResponse(
+    return ModelResponse(TaskResponse(
         success=True,
         message="Task created successfully",
         task=new_task
-    )
+    ), status_code=status.HTTP_201_CREATED)
 
 
 @router.put("/update_task/{task_id}", response_model=TaskResponse)
 def update_task(task_id: int, task: TaskUpdate, db: Session = Depends(deps.get_db),
-                current_user=Depends(deps.require_login)):
+                logged_in_user: Principal = Depends(deps.require_user)):
     """Update an existing task."""
-    updated_task = crud_task.update_task(db, task_id, task, deps.get_current_user_from_payload(
-        db=db, payload=current_user).id)
+    updated_task = crud_task.update_task(db, task_id, task, logged_in_user.id)
     if updated_task is None:
         raise HTTPException(status_code=404, detail="Task not found")
-    return TaskResponse(
+    return ModelResponse(TaskResponse(
         success=True,
         message="Task updated successfully",
         task=updated_task
-    )
+    ))
 
 
 @router.delete("/delete_task/{task_id}", response_model=TaskResponse)
 def delete_task(task_id: int, db: Session = Depends(deps.get_db),
-                current_user=Depends(deps.require_login)):
+                logged_in_user: Principal = Depends(deps.require_user)):
     """Delete a task by its ID."""
-    existing_task = crud_task.get_task(db, task_id)
-    if existing_task is None:
-        raise HTTPException(status_code=404, detail="Task not found")
-    existing_task.is_deleted = True
     deleted_task = crud_task.update_task(
         db,
         task_id,
-        existing_task,
-        deps.get_current_user_from_payload(db=db, payload=current_user).id)
-    return TaskResponse(
+        TaskUpdate(id=task_id, is_deleted=True),
+        logged_in_user.id)
+    if deleted_task is None:
+        raise HTTPException(status_code=404, detail="Task not found")
+    return ModelResponse(TaskResponse(
         success=True,
         message="Task deleted successfully",
         task=deleted_task
-    )
+    ))
+
+
+@router.post("/bulk/create_tasks", response_model=BulkTasksResponse,
+             status_code=status.HTTP_201_CREATED)
+def bulk_create_tasks(bulk: TaskBulkCreate, db: Session = Depends(deps.get_db),
+                      logged_in_user: Principal = Depends(deps.require_user)):
+    """Create many tasks in a single transaction."""
+    results = crud_task.bulk_create_tasks(db, bulk.tasks, logged_in_user.id)
+    return ModelResponse(BulkTasksResponse(
+        success=all(result.success for result in results),
+        message="Tasks created",
+        results=results
+    ), status_code=status.HTTP_201_CREATED)
+
+
+@router.put("/bulk/update_tasks", response_model=BulkTasksResponse)
+def bulk_update_tasks(bulk: TaskBulkUpdate, db: Session = Depends(deps.get_db),
+                      logged_in_user: Principal = Depends(deps.require_user)):
+    """Update many tasks in a single transaction."""
+    results = crud_task.bulk_update_tasks(db, bulk.tasks, logged_in_user.id)
+    return ModelResponse(BulkTasksResponse(
+        success=all(result.success for result in results),
+        message="Tasks updated",
+        results=results
+    ))
+
+
+@router.delete("/bulk/delete_tasks", response_model=BulkTasksResponse)
+def bulk_delete_tasks(bulk: TaskBulkDelete, db: Session = Depends(deps.get_db),
+                      logged_in_user: Principal = Depends(deps.require_user)):
+    """Soft delete many tasks with a single statement."""
+    results = crud_task.bulk_delete_tasks(db, bulk.ids, logged_in_user.id)
+    return ModelResponse(BulkTasksResponse(
+        success=all(result.success for result in results),
+        message="Tasks deleted",
+        results=results
+    ))
@@ -0,0 +1,217 @@
+"""Async task routes, served instead of tasks.py when USE_ASYNC_DB is enabled."""
+from datetime import datetime
+from typing import Optional
+from fastapi import APIRouter, HTTPException, Query, Request, status, Depends
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api import deps, deps_async
+from app.api.routes.tasks import (BulkTasksResponse, TaskChangesResponse, TaskResponse,
+                                  TasksResponse, page_etag, stream_tasks,
+                                  task_changes_response, task_page_response)
+from app.core import http_cache
+from app.core.responses import ModelResponse
+from app.schemas.task import (TaskBulkCreate, TaskBulkDelete, TaskBulkUpdate, TaskCreate,
+                              TaskUpdate)
+from app.schemas.user import Principal
+from app.crud import export as crud_export
+from app.crud import export_async
+from app.crud import task_async as crud_task
+
+router = APIRouter()
+
+
+@router.get("/read_tasks", response_model=TasksResponse)
+async def read_tasks(request: Request, skip: int = Query(default=0, ge=0),
+                     limit: int = Query(default=100, ge=1, le=1000),
+                     cursor: Optional[str] = None,
+                     db: AsyncSession = Depends(deps_async.get_async_db)):
+    """Retrieve a list of tasks with cursor or skip/limit pagination."""
+    try:
+        # Read before the page, so a change in between is never hidden behind this ETag
+        page_ids, last_modified = await crud_task.get_tasks_version(
+            db, skip=skip, limit=limit, cursor=cursor)
+        etag = page_etag(request, page_ids, last_modified)
+        if http_cache.is_not_modified(request, etag, None):
+            return http_cache.not_modified_response(etag, last_modified)
+        tasks, next_cursor = await crud_task.get_tasks(
+            db, skip=skip, limit=limit, cursor=cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
+    return http_cache.set_cache_headers(
+        task_page_response(tasks, next_cursor), etag, last_modified)
+
+
+@router.get("/filter_tasks", response_model=TasksResponse)
+async def filter_tasks(request: Request, assigned_to: Optional[int] = None,
+                       assigned_by: Optional[int] = None, status: Optional[str] = None,
+                       priority: Optional[str] = None, due_from: Optional[datetime] = None,
+                       due_to: Optional[datetime] = None, include_deleted: bool = False,
+                       limit: int = Query(default=100, ge=1, le=1000),
+                       cursor: Optional[str] = None,
+                       db: AsyncSession = Depends(deps_async.get_async_db)):
+    """Retrieve a page of tasks filtered in SQL by assignee, status, priority and due date."""
+    filters = dict(assigned_to=assigned_to, assigned_by=assigned_by, status=status,
+                   priority=priority, due_from=due_from, due_to=due_to,
+                   include_deleted=include_deleted, limit=limit, cursor=cursor)
+    try:
+        page_ids, last_modified = await crud_task.filter_tasks_version(db, **filters)
+        etag = page_etag(request, page_ids, last_modified)
+        if http_cache.is_not_modified(request, etag, None):
+            return http_cache.not_modified_response(etag, last_modified)
+        tasks, next_cursor = await crud_task.filter_tasks(db, **filters)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
+    return http_cache.set_cache_headers(
+        task_page_response(tasks, next_cursor), etag, last_modified)
+
+
+@router.get("/changes", response_model=TaskChangesResponse)
+async def read_task_changes(since: Optional[str] = None,
+                            limit: int = Query(default=100, ge=1, le=1000),
+                            db: AsyncSession = Depends(deps_async.get_async_db)):
+    """Retrieve the tasks created, updated or soft deleted since a change cursor."""
+    try:
+        tasks, next_cursor, has_more = await crud_task.get_task_changes(
+            db, limit=limit, since=since)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
+    return task_changes_response(tasks, next_cursor, has_more)
+
+
+# Already async and database free, shared with the sync routes
+router.add_api_route("/stream", stream_tasks, methods=["GET"])
+
+
+@router.get("/export_tasks")
+async def export_tasks(file_format: str = Query(default="ndjson", alias="format"),
+                       assigned_to: Optional[int] = None, assigned_by: Optional[int] = None,
+                       status: Optional[str] = None, priority: Optional[str] = None,
+                       due_from: Optional[datetime] = None, due_to: Optional[datetime] = None,
+                       include_deleted: bool = False,
+                       db: AsyncSession = Depends(deps_async.get_async_db),
+                       current_user=Depends(deps.require_login)):
+    """Stream every task matching the filters as NDJSON or CSV, in constant memory."""
+    try:
+        media_type = crud_export.get_media_type(file_format)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
+    stmt = crud_export.build_task_export_query(
+        assigned_to=assigned_to, assigned_by=assigned_by, status=status,
+        priority=priority, due_from=due_from, due_to=due_to,
+        include_deleted=include_deleted)
+    return StreamingResponse(
+        export_async.export_rows(db, stmt, file_format), media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="tasks.{file_format}"'})
+
+
+@router.get("/read_task/{task_id}", response_model=TaskResponse)
+async def read_task(request: Request, task_id: int,
+                    db: AsyncSession = Depends(deps_async.get_async_db)):
+    """Retrieve a task by its ID."""
+    existing_task, modified_at = await crud_task.get_task(db, task_id=task_id)
+    if existing_task is None:
+        raise HTTPException(status_code=404, detail="Task not found")
+    etag = http_cache.make_etag("task", task_id, modified_at)
+    if http_cache.is_not_modified(request, etag, modified_at):
+        return http_cache.not_modified_response(etag, modified_at)
+    return http_cache.set_cache_headers(ModelResponse(TaskResponse(
+        success=True,
+        message="Task read successfully",
+        task=existing_task
+    )), etag, modified_at)
+
+
+@router.post("/create_task", response_model=TaskResponse, status_code=status.HTTP_201_CREATED)
+async def create_task(task: TaskCreate, db: AsyncSession = Depends(deps_async.get_async_db),
+                      logged_in_user: Principal = Depends(deps_async.require_user)):
+    """Create a new task."""
+    try:
+        # Set the user who created the task
+        task.assigned_by = logged_in_user.id
+        new_task = await crud_task.create_task(db=db, task=task)
+        if new_task is None:
+            raise HTTPException(status_code=400, detail="Task creation failed")
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error creating task: {str(e)}"
+        ) from e
+    return ModelResponse(TaskResponse(
+        success=True,
+        message="Task created successfully",
+        task=new_task
+    ), status_code=status.HTTP_201_CREATED)
+
+
+@router.put("/update_task/{task_id}", response_model=TaskResponse)
+async def update_task(task_id: int, task: TaskUpdate,
+                      db: AsyncSession = Depends(deps_async.get_async_db),
+                      logged_in_user: Principal = Depends(deps_async.require_user)):
+    """Update an existing task."""
+    updated_task = await crud_task.update_task(db, task_id, task, logged_in_user.id)
+    if updated_task is None:
+        raise HTTPException(status_code=404, detail="Task not found")
+    return ModelResponse(TaskResponse(
+        success=True,
+        message="Task updated successfully",
+        task=updated_task
+    ))
+
+
+@router.delete("/delete_task/{task_id}", response_model=TaskResponse)
+async def delete_task(task_id: int, db: AsyncSession = Depends(deps_async.get_async_db),
+                      logged_in_user: Principal = Depends(deps_async.require_user)):
+    """Delete a task by its ID."""
+    deleted_task = await crud_task.update_task(
+        db,
+        task_id,
+        TaskUpdate(id=task_id, is_deleted=True),
+        logged_in_user.id)
+    if deleted_task is None:
+        raise HTTPException(status_code=404, detail="Task not found")
+    return ModelResponse(TaskResponse(
+        success=True,
+        message="Task deleted successfully",
+        task=deleted_task
+    ))
+
+
+@router.post("/bulk/create_tasks", response_model=BulkTasksResponse,
+             status_code=status.HTTP_201_CREATED)
+async def bulk_create_tasks(bulk: TaskBulkCreate,
+                            db: AsyncSession = Depends(deps_async.get_async_db),
+                            logged_in_user: Principal = Depends(deps_async.require_user)):
+    """Create many tasks in a single transaction."""
+    results = await crud_task.bulk_create_tasks(db, bulk.tasks, logged_in_user.id)
+    return ModelResponse(BulkTasksResponse(
+        success=all(result.success for result in results),
+        message="Tasks created",
+        results=results
+    ), status_code=status.HTTP_201_CREATED)
+
+
+@router.put("/bulk/update_tasks", response_model=BulkTasksResponse)
+async def bulk_update_tasks(bulk: TaskBulkUpdate,
+                            db: AsyncSession = Depends(deps_async.get_async_db),
+                            logged_in_user: Principal = Depends(deps_async.require_user)):
+    """Update many tasks in a single transaction."""
+    results = await crud_task.bulk_update_tasks(db, bulk.tasks, logged_in_user.id)
+    return ModelResponse(BulkTasksResponse(
+        success=all(result.success for result in results),
+        message="Tasks updated",
+        results=results
+    ))
+
+
+@router.delete("/bulk/delete_tasks", response_model=BulkTasksResponse)
+async def bulk_delete_tasks(bulk: TaskBulkDelete,
+                            db: AsyncSession = Depends(deps_async.get_async_db),
+                            logged_in_user: Principal = Depends(deps_async.require_user)):
+    """Soft delete many tasks with a single statement."""
+    results = await crud_task.bulk_delete_tasks(db, bulk.ids, logged_in_user.id)
+    return ModelResponse(BulkTasksResponse(
+        success=all(result.success for result in results),
+        message="Tasks deleted",
+        results=results
+    ))
@@ -0,0 +1,18 @@
+"""Well-known discovery routes of the Employment API."""
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+
+from app.core.jwt_handle import get_jwks
+from app.core.jwt_keys import JWT_KEY_ACTIVATION_SECONDS
+
+# Verifiers may cache the key set as long as new keys are published before they sign
+JWKS_MAX_AGE_SECONDS = int(JWT_KEY_ACTIVATION_SECONDS)
+
+router = APIRouter()
+
+
+@router.get("/jwks.json")
+def jwks():
+    """Publish the public keys verifying our tokens, so other services verify them locally."""
+    return JSONResponse(get_jwks(),
+                        headers={"Cache-Control": f"public, max-age={JWKS_MAX_AGE_SECONDS}"})
@@ -0,0 +1,137 @@
+"""In-process fan-out of server-sent events for the Employment API."""
+import asyncio
+import os
+import threading
+import time
+from collections import defaultdict
+from typing import Callable, Optional
+from pydantic import BaseModel
+
+# Events buffered per subscriber; a subscriber falling further behind is disconnected
+EVENT_QUEUE_SIZE = int(os.getenv("EVENT_QUEUE_SIZE", "100"))
+# Seconds between keep-alive comments on an idle stream, so proxies keep it open
+EVENT_KEEPALIVE_SECONDS = float(os.getenv("EVENT_KEEPALIVE_SECONDS", "15"))
+
+# Sent to a subscriber that fell behind, before its stream ends; the client catches up
+# through the change feed and subscribes again
+RESYNC_FRAME = b"event: resync\ndata: {}\n\n"
+KEEPALIVE_FRAME = b": keep-alive\n\n"
+
+
+class Subscription:
+    """Bounded queue of the frames of one subscriber, filled on its event loop."""
+
+    def __init__(self, topic, loop: asyncio.AbstractEventLoop, size: int):
+        self.topic = topic
+        self.loop = loop
+        self.size = size
+        # Bounded by put, so the closing frames always fit
+        self.queue = asyncio.Queue()
+        self.closed = False
+
+    def put(self, frame: bytes):
+        """Queue a frame, closing the subscription instead of blocking when it is full."""
+        if self.closed:
+            return
+        if frame is None or self.queue.qsize() >= self.size:
+            self.close(resync=frame is not None)
+            return
+        self.queue.put_nowait(frame)
+
+    def close(self, resync: bool = False):
+        """Drop pending frames and end the stream, with a resync event if asked."""
+        self.closed = True
+        while not self.queue.empty():
+            self.queue.get_nowait()
+        if resync:
+            self.queue.put_nowait(RESYNC_FRAME)
+        self.queue.put_nowait(None)
+
+
+class EventHub:
+    """Fans published events out to the subscribers of a topic, e.g. an assignee id.
+
+    Publishing never blocks: it may run on any thread (sync routes run on the thread
+    pool) and hands every frame to the event loop of each subscriber, whose bounded
+    queue drops the subscriber rather than holding the publisher back. Events only
+    reach the subscribers of this process.
+    """
+
+    def __init__(self, queue_size: int = EVENT_QUEUE_SIZE):
+        self.queue_size = queue_size
+        self._lock = threading.Lock()
+        self._subscriptions = defaultdict(set)
+
+    def has_subscribers(self, topic) -> bool:
+        """Whether anyone listens to a topic, so publishers can skip building events."""
+        return bool(self._subscriptions.get(topic))
+
+    def subscribe(self, topic) -> Subscription:
+        """Register a subscriber of a topic on the running event loop."""
+        subscription = Subscription(topic, asyncio.get_running_loop(), self.queue_size)
+        with self._lock:
+            self._subscriptions[topic].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        """Remove a subscriber, once its stream has ended."""
+        with self._lock:
+            subscriptions = self._subscriptions.get(subscription.topic)
+            if subscriptions is not None:
+                subscriptions.discard(subscription)
+                if not subscriptions:
+                    del self._subscriptions[subscription.topic]
+
+    def publish(self, topic, event: str, payload: BaseModel):
+        """Send an event to every subscriber of a topic, serialized once for all of them."""
+        if not self.has_subscribers(topic):
+            return
+        frame = f"event: {event}\ndata: {payload.model_dump_json()}\n\n".encode("utf-8")
+        self._broadcast(frame, topic)
+
+    def close(self):
+        """End every stream, when the server shuts down."""
+        self._broadcast(None)
+
+    def _broadcast(self, frame, topic=None):
+        """Hand a frame to the subscribers of a topic, or of every topic without one."""
+        with self._lock:
+            if topic is None:
+                subscriptions = [sub for subs in self._subscriptions.values() for sub in subs]
+            else:
+                subscriptions = list(self._subscriptions.get(topic, ()))
+        for subscription in subscriptions:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription.put, frame)
+            except RuntimeError:
+                # The subscriber's event loop is closed
+                self.unsubscribe(subscription)
+
+    async def stream(self, topic, is_allowed: Optional[Callable[[], bool]] = None):
+        """Yield the frames of a new subscription of a topic, with keep-alives when idle.
+
+        ``is_allowed`` is called again every EVENT_KEEPALIVE_SECONDS, busy or idle, and the
+        stream ends as soon as it returns False, e.g. once the subscriber's token is revoked.
+        """
+        subscription = self.subscribe(topic)
+        checked_at = time.monotonic()
+        try:
+            while True:
+                try:
+                    frame = await asyncio.wait_for(
+                        subscription.queue.get(), EVENT_KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    frame = KEEPALIVE_FRAME
+                if frame is None:
+                    break
+                if is_allowed is not None and \
+                        time.monotonic() - checked_at >= EVENT_KEEPALIVE_SECONDS:
+                    if not is_allowed():
+                        break
+                    checked_at = time.monotonic()
+                yield frame
+        finally:
+            self.unsubscribe(subscription)
+
+
+task_hub = EventHub()
@@ -0,0 +1,58 @@
+"""HTTP conditional request helpers (ETag, Last-Modified, 304) for the Employment API."""
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Optional
+from fastapi import Request, Response, status
+
+# Clients may keep responses but must revalidate them before every reuse
+CACHE_CONTROL = "private, no-cache"
+
+
+def make_etag(*parts) -> str:
+    """Build a strong ETag from the values that identify a version of a resource."""
+    digest = hashlib.blake2b(repr(parts).encode(), digest_size=16).hexdigest()
+    return f'"{digest}"'
+
+
+def _to_utc(value: datetime) -> datetime:
+    """Convert a timestamp to UTC, naive ones are in server local time like modified_at."""
+    return value.astimezone(timezone.utc)
+
+
+def is_not_modified(request: Request, etag: str, last_modified: Optional[datetime]) -> bool:
+    """Whether the client's cached copy is current, per If-None-Match or If-Modified-Since.
+
+    If-None-Match takes precedence and is compared weakly, as RFC 9110 asks for GET.
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        return "*" in tags or etag in tags
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since is None or last_modified is None:
+        return False
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    if since.tzinfo is None:
+        return False
+    # HTTP dates have a one second resolution
+    return _to_utc(last_modified).replace(microsecond=0) <= since
+
+
+def set_cache_headers(response: Response, etag: str,
+                      last_modified: Optional[datetime]) -> Response:
+    """Add the validators of a resource to a response."""
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = CACHE_CONTROL
+    if last_modified is not None:
+        response.headers["Last-Modified"] = format_datetime(_to_utc(last_modified), usegmt=True)
+    return response
+
+
+def not_modified_response(etag: str, last_modified: Optional[datetime]) -> Response:
+    """Return an empty 304 Not Modified response carrying the validators."""
+    return set_cache_headers(
+        Response(status_code=status.HTTP_304_NOT_MODIFIED), etag, last_modified)
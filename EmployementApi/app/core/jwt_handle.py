@@ -1,11 +1,49 @@
 """JWT utility functions for creating and decoding JSON Web Tokens (JWTs)."""
+import hashlib
+import os
+import time
+import uuid
 from datetime import datetime, timedelta, timezone
 import jwt
+from app.core.cache import TTLCache
+from app.core.jwt_keys import KeyRing
 
-SECRET_KEY = "MySecretKeyForJWT"  # Use a strong secret in production!
+# Shared HS256 secret, there is no default: HS256 tokens are neither signed nor accepted
+# without one, as anyone knowing a default secret could forge them
+SECRET_KEY = os.getenv("JWT_SECRET_KEY") or None
 ALGORITHM = "HS256"
+# Directory of the EdDSA/ES256 signing keys, see jwt_keys; tokens are signed HS256 without it
+JWT_KEYS_DIR = os.getenv("JWT_KEYS_DIR")
+# Whether HS256 tokens (no kid) are still accepted next to JWT_KEYS_DIR, e.g. until those
+# issued before the switch have expired; off by default once the key directory is set
+JWT_ACCEPT_HS256 = SECRET_KEY is not None and os.getenv(
+    "JWT_ACCEPT_HS256", "false" if JWT_KEYS_DIR else "true").lower() == "true"
 ACCESS_TOKEN_EXPIRE_MINUTES = 120  # 2 hours
 REFRESH_TOKEN_EXPIRE_DAYS = 7
+TOKEN_CACHE_SIZE = int(os.getenv("TOKEN_CACHE_SIZE", "4096"))
+# How long a token that failed verification is remembered as invalid
+TOKEN_NEGATIVE_CACHE_SECONDS = float(os.getenv("TOKEN_NEGATIVE_CACHE_SECONDS", "5"))
+
+# Verified payloads (None for rejected tokens) by token digest, until the token expires
+token_cache = TTLCache(maxsize=TOKEN_CACHE_SIZE, ttl=TOKEN_NEGATIVE_CACHE_SECONDS)
+_MISSING = object()
+
+# Tokens of a removed key must stop verifying, cached payloads included
+key_ring = KeyRing(JWT_KEYS_DIR, on_removed=token_cache.clear) if JWT_KEYS_DIR else None
+if key_ring is None and SECRET_KEY is None:
+    raise RuntimeError(
+        "Set JWT_KEYS_DIR, or JWT_SECRET_KEY to sign tokens with HS256, see .env.example")
+
+
+def _encode(to_encode: dict) -> str:
+    """Sign claims with the current key of the ring, or HS256 without a ring."""
+    if key_ring is None:
+        return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
+    key = key_ring.signing_key()
+    if key is None:
+        raise RuntimeError(f"No private key to sign tokens with in {JWT_KEYS_DIR}")
+    return jwt.encode(to_encode, key.private_key, algorithm=key.algorithm,
+                      headers={"kid": key.kid})
 
 
 def create_access_token(data: dict, expires_delta: timedelta = None):
@@ -13,8 +51,9 @@ def create_access_token(data: dict, expires_delta: timedelta = None):
     to_encode = data.copy()
     expire = datetime.now(
         timezone.utc) + (expires_delta or timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES))
-    to_encode.update({"exp": expire, "type": "access"})
-    return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
+    # jti identifies the token, so it can be revoked on its own
+    to_encode.update({"exp": expire, "type": "access", "jti": uuid.uuid4().hex})
+    return _encode(to_encode)
 
 
 def create_refresh_token(data: dict, expires_delta: timedelta = None):
@@ -22,14 +61,50 @@ def create_refresh_token(data: dict, expires_delta: timedelta = None):
     to_encode = data.copy()
     expire = datetime.now(
         timezone.utc) + (expires_delta or timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS))
-    to_encode.update({"exp": expire, "type": "refresh"})
-    return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
+    to_encode.update({"exp": expire, "type": "refresh", "jti": uuid.uuid4().hex})
+    return _encode(to_encode)
 
 
 def decode_access_token(token: str):
-    """Decode a JSON Web Token (JWT) and return the payload."""
+    """Decode a JSON Web Token (JWT) and return the payload, None when it is not valid.
+
+    The kid of the header picks the verifying key and, with it, the only accepted
+    algorithm; tokens without a kid are HS256.
+    """
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        return payload
+        kid = jwt.get_unverified_header(token).get("kid")
+        if kid is None:
+            if not JWT_ACCEPT_HS256 or SECRET_KEY is None:
+                return None
+            return jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        key = key_ring.get(kid) if key_ring is not None else None
+        if key is None:
+            return None
+        return jwt.decode(token, key.public_key, algorithms=[key.algorithm])
     except jwt.PyJWTError:
         return None
+
+
+def get_jwks() -> dict:
+    """Return the JSON Web Key Set of the public keys verifying our tokens."""
+    return key_ring.jwks() if key_ring is not None else {"keys": []}
+
+
+def verify_access_token(token: str):
+    """Decode a JWT like decode_access_token, reusing the result for tokens seen recently.
+
+    Payloads stay cached until the token's exp, rejected tokens for
+    TOKEN_NEGATIVE_CACHE_SECONDS. Tokens are keyed by digest, never stored themselves.
+    """
+    key = hashlib.blake2b(token.encode(), digest_size=16).digest()
+    payload = token_cache.get(key, _MISSING)
+    if payload is _MISSING:
+        payload = decode_access_token(token)
+        if payload is None:
+            token_cache.set(key, None)
+        elif "exp" in payload:
+            token_cache.set(key, payload, ttl=payload["exp"] - time.time())
+        else:
+            return payload
+    # Callers get their own copy, the cached payload is shared
+    return None if payload is None else dict(payload)
@@ -0,0 +1,172 @@
+"""Asymmetric JWT signing keys, loaded from PEM files and reloaded when they change.
+
+Every file of JWT_KEYS_DIR is one key, its name without extension is the key id (kid):
+
+- ``<kid>.pem`` holds a private key, Ed25519 (EdDSA) or EC P-256 (ES256), e.g. made with
+  ``openssl genpkey -algorithm ed25519 -out 2026-10-18.pem``
+- ``<kid>.pub.pem`` holds a public key only, to keep verifying the tokens of a retired
+  key until they expire
+
+The private key with the greatest kid signs, so naming keys by date makes a rotation
+a matter of adding the new file, then turning the old one into a .pub.pem. A new key
+is published right away but only signs once its file is JWT_KEY_ACTIVATION_SECONDS old,
+so verifiers caching the key set know it before they see its first token.
+"""
+import os
+import threading
+import time
+from typing import Optional
+
+try:
+    from cryptography.hazmat.primitives.asymmetric import ec, ed25519
+    from jwt.algorithms import ECAlgorithm, OKPAlgorithm
+    from cryptography.hazmat.primitives.serialization import (load_pem_private_key,
+                                                              load_pem_public_key)
+except ImportError:  # pragma: no cover - only needed for asymmetric signing
+    ec = ed25519 = None
+
+# Seconds between two checks of the key directory for added, changed or removed keys
+JWT_KEYS_RELOAD_SECONDS = float(os.getenv("JWT_KEYS_RELOAD_SECONDS", "5"))
+# Seconds a new key is published before it signs, at least how long verifiers cache keys
+JWT_KEY_ACTIVATION_SECONDS = float(os.getenv("JWT_KEY_ACTIVATION_SECONDS", "300"))
+
+PUBLIC_KEY_SUFFIX = ".pub.pem"
+PRIVATE_KEY_SUFFIX = ".pem"
+
+
+class JWTKey:
+    """A key of the ring: id, JWS algorithm, public key, and private key when it can sign."""
+
+    __slots__ = ("kid", "algorithm", "public_key", "private_key", "created_at")
+
+    def __init__(self, kid: str, algorithm: str, public_key, private_key=None,
+                 created_at: float = 0.0):
+        self.kid = kid
+        self.algorithm = algorithm
+        self.public_key = public_key
+        self.private_key = private_key
+        # Modification time of the key file, in epoch seconds
+        self.created_at = created_at
+
+    def to_jwk(self) -> dict:
+        """Return the public key as a JSON Web Key."""
+        algorithm = OKPAlgorithm if self.algorithm == "EdDSA" else ECAlgorithm
+        jwk = algorithm.to_jwk(self.public_key, as_dict=True)
+        jwk.update({"kid": self.kid, "alg": self.algorithm, "use": "sig"})
+        return jwk
+
+
+def _get_algorithm(public_key) -> str:
+    """Return the JWS algorithm of a public key, only EdDSA and ES256 keys are accepted."""
+    if isinstance(public_key, ed25519.Ed25519PublicKey):
+        return "EdDSA"
+    if isinstance(public_key, ec.EllipticCurvePublicKey) and \
+            public_key.curve.name == "secp256r1":
+        return "ES256"
+    raise ValueError(f"Unsupported JWT key type {type(public_key).__name__}")
+
+
+def load_key(path: str) -> JWTKey:
+    """Load a key from a PEM file named after its kid."""
+    with open(path, "rb") as key_file:
+        data = key_file.read()
+    name = os.path.basename(path)
+    if name.endswith(PUBLIC_KEY_SUFFIX):
+        public_key, private_key = load_pem_public_key(data), None
+        kid = name[:-len(PUBLIC_KEY_SUFFIX)]
+    else:
+        private_key = load_pem_private_key(data, password=None)
+        public_key = private_key.public_key()
+        kid = name[:-len(PRIVATE_KEY_SUFFIX)]
+    return JWTKey(kid, _get_algorithm(public_key), public_key, private_key,
+                  os.path.getmtime(path))
+
+
+class KeyRing:
+    """Keys of a directory by kid, reloaded at most every reload_seconds when files change.
+
+    A directory that fails to load (a key half written during a rotation) keeps the
+    previous keys until the next check. on_removed is called when keys disappear, so
+    whatever was verified with them can be dropped.
+    """
+
+    def __init__(self, directory: str, reload_seconds: float = JWT_KEYS_RELOAD_SECONDS,
+                 activation_seconds: float = JWT_KEY_ACTIVATION_SECONDS, on_removed=None):
+        if ed25519 is None:
+            raise RuntimeError("JWT_KEYS_DIR needs the cryptography package installed")
+        self.directory = directory
+        self.reload_seconds = reload_seconds
+        self.activation_seconds = activation_seconds
+        self.on_removed = on_removed
+        self._lock = threading.Lock()
+        self._keys = {}
+        self._signing_keys = []  # private keys by ascending kid
+        self._jwks = {"keys": []}
+        self._files = None
+        self._checked_at = 0.0
+        self.reload()
+
+    def _list_files(self) -> tuple:
+        """Return the name, size and mtime of every key file, to detect changes."""
+        files = []
+        for entry in os.scandir(self.directory):
+            if entry.is_file() and entry.name.endswith(PRIVATE_KEY_SUFFIX):
+                stat = entry.stat()
+                files.append((entry.name, stat.st_size, stat.st_mtime_ns))
+        return tuple(sorted(files))
+
+    def reload(self):
+        """Load the keys of the directory if its files changed since the last load."""
+        files = self._list_files()
+        if files == self._files:
+            return
+        keys = {}
+        for name, _, _ in files:
+            key = load_key(os.path.join(self.directory, name))
+            # A private key wins over the public copy of the same kid
+            if key.kid not in keys or key.private_key is not None:
+                keys[key.kid] = key
+        with self._lock:
+            removed = self._keys.keys() - keys.keys()
+            self._keys = keys
+            self._signing_keys = [keys[kid] for kid in sorted(keys)
+                                  if keys[kid].private_key is not None]
+            self._jwks = {"keys": [keys[kid].to_jwk() for kid in sorted(keys)]}
+            self._files = files
+        if removed and self.on_removed is not None:
+            self.on_removed()
+
+    def _check(self):
+        """Reload the keys when the last check is older than reload_seconds."""
+        now = time.monotonic()
+        if now - self._checked_at < self.reload_seconds:
+            return
+        self._checked_at = now
+        try:
+            self.reload()
+        except (OSError, TypeError, ValueError):
+            # Keep serving the previous keys, the next check retries
+            pass
+
+    def get(self, kid: str) -> Optional[JWTKey]:
+        """Return the key of a kid, None for unknown kids."""
+        self._check()
+        return self._keys.get(kid)
+
+    def signing_key(self) -> Optional[JWTKey]:
+        """Return the key new tokens are signed with: the greatest active kid.
+
+        When no key is old enough yet, e.g. on a fresh install, the greatest kid signs.
+        """
+        self._check()
+        signing_keys = self._signing_keys
+        activated_before = time.time() - self.activation_seconds
+        for key in reversed(signing_keys):
+            if key.created_at <= activated_before:
+                return key
+        return signing_keys[-1] if signing_keys else None
+
+    def jwks(self) -> dict:
+        """Return the public keys as a JSON Web Key Set."""
+        self._check()
+        return self._jwks
@@ -0,0 +1,52 @@
+"""Cursor helpers for keyset pagination in the Employment API."""
+import base64
+import json
+from datetime import datetime
+
+
+def _encode(data: dict) -> str:
+    """Encode cursor data into an opaque, URL-safe token."""
+    raw = json.dumps(data, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def _decode(cursor: str) -> dict:
+    """Decode an opaque token back into its cursor data."""
+    padded = cursor + "=" * (-len(cursor) % 4)
+    data = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    if not isinstance(data, dict):
+        raise ValueError("Cursor is not an object.")
+    return data
+
+
+def encode_cursor(last_id: int) -> str:
+    """Encode the id of the last row on a page into an opaque cursor token."""
+    return _encode({"id": last_id})
+
+
+def decode_cursor(cursor: str) -> int:
+    """Decode a cursor token back into the id of the last row already seen."""
+    try:
+        last_id = _decode(cursor)["id"]
+    except (ValueError, TypeError, KeyError) as e:
+        raise ValueError("Invalid pagination cursor.") from e
+    if not isinstance(last_id, int):
+        raise ValueError("Invalid pagination cursor.")
+    return last_id
+
+
+def encode_change_cursor(modified_at: datetime, last_id: int) -> str:
+    """Encode the modification time and id of the last change seen into a cursor token."""
+    return _encode({"t": modified_at.isoformat(), "id": last_id})
+
+
+def decode_change_cursor(cursor: str) -> tuple[datetime, int]:
+    """Decode a change cursor token back into (modified_at, id) of the last change seen."""
+    try:
+        data = _decode(cursor)
+        modified_at, last_id = datetime.fromisoformat(data["t"]), data["id"]
+    except (ValueError, TypeError, KeyError) as e:
+        raise ValueError("Invalid change cursor.") from e
+    if not isinstance(last_id, int):
+        raise ValueError("Invalid change cursor.")
+    return modified_at, last_id
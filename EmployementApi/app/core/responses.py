@@ -0,0 +1,40 @@
+"""Response classes for the Employment API."""
+import json
+from dataclasses import asdict, is_dataclass
+from datetime import date, datetime
+from typing import Any
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is optional
+    orjson = None
+
+
+def _json_default(value):
+    """Render what stdlib json does not know, the way orjson does."""
+    if is_dataclass(value):
+        return asdict(value)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"Cannot serialize {type(value).__name__}")
+
+
+class ModelResponse(JSONResponse):
+    """JSON response rendered straight from an already validated Pydantic model.
+
+    FastAPI validates whatever a route returns against its response_model once more
+    (on a worker thread for sync routes) before serializing it. Routes that already
+    built the declared model return it wrapped in this response instead, which is
+    serialized once by pydantic-core. Other content, such as pages of TaskRow
+    dataclasses, is rendered with orjson when it is installed, stdlib json otherwise.
+    """
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, BaseModel):
+            return content.model_dump_json().encode("utf-8")
+        if orjson is not None:
+            return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+        return json.dumps(content, ensure_ascii=False, allow_nan=False,
+                          separators=(",", ":"), default=_json_default).encode("utf-8")
@@ -0,0 +1,53 @@
+"""In-memory denylist of revoked tokens for the Employment API."""
+import threading
+import time
+
+
+class TokenDenylist:
+    """Revoked token ids and per-user minimum token versions, checked on every request.
+
+    Lookups are two dict reads without locking. Entries are kept until every token they
+    cover has expired, when prune drops them; the revoked_tokens table is the source of
+    truth that every worker syncs from.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._jtis = {}  # jti -> expiry (epoch seconds)
+        self._versions = {}  # user id -> (lowest valid token version, expiry)
+
+    def revoke_token(self, jti: str, expires_at: float):
+        """Revoke a single token until it expires."""
+        with self._lock:
+            self._jtis[jti] = expires_at
+
+    def revoke_user(self, user_id: int, token_version: int, expires_at: float):
+        """Revoke every token of a user carrying a version lower than token_version."""
+        with self._lock:
+            current_version, current_expiry = self._versions.get(user_id, (0, 0.0))
+            self._versions[user_id] = (max(current_version, token_version),
+                                       max(current_expiry, expires_at))
+
+    def is_revoked(self, payload: dict) -> bool:
+        """Whether the token of a decoded payload has been revoked."""
+        jti = payload.get("jti")
+        if jti is not None and jti in self._jtis:
+            return True
+        version = self._versions.get(payload.get("uid"))
+        # Tokens issued before versioning carry no "ver" and count as version 0
+        return version is not None and payload.get("ver", 0) < version[0]
+
+    def prune(self, now: float = None):
+        """Drop the entries whose tokens have all expired."""
+        now = time.time() if now is None else now
+        with self._lock:
+            self._jtis = {jti: exp for jti, exp in self._jtis.items() if exp > now}
+            self._versions = {user_id: entry for user_id, entry in self._versions.items()
+                              if entry[1] > now}
+
+    def stats(self) -> dict:
+        """Return the number of revoked tokens and users held in memory."""
+        return {"revoked_tokens": len(self._jtis), "revoked_users": len(self._versions)}
+
+
+token_denylist = TokenDenylist()
@@ -1,12 +1,242 @@
 """This file contains the security utilities for the Employment API, including password hashing."""
+import asyncio
+import importlib.util
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
 from passlib.context import CryptContext
+from dotenv import load_dotenv
+
+load_dotenv()  # Load .env file
+
+# Number of worker processes used for hashing, 0 hashes inline on the calling thread
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(os.cpu_count() or 1)))
+# Maximum number of hash/verify jobs allowed in flight (running + queued)
+PASSWORD_HASH_MAX_PENDING = int(
+    os.getenv("PASSWORD_HASH_MAX_PENDING", str(max(PASSWORD_HASH_WORKERS, 1) * 4)))
+# Seconds an async request queues for a free slot before it is rejected; sync requests
+# are rejected at once, so no threadpool thread ever waits for a slot
+PASSWORD_HASH_QUEUE_TIMEOUT = float(os.getenv("PASSWORD_HASH_QUEUE_TIMEOUT", "0.5"))
+
+# Scheme of new hashes, "bcrypt" or "argon2" (argon2id, needs argon2-cffi); hashes of the
+# other scheme still verify and are replaced on the next successful login
+PASSWORD_HASH_SCHEME = os.getenv("PASSWORD_HASH_SCHEME", "bcrypt")
+# Hashing costs, pick them with calibrate_password_hashing.py; a hash made with other
+# costs is replaced on the next successful login
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+ARGON2_TIME_COST = int(os.getenv("ARGON2_TIME_COST", "2"))
+ARGON2_MEMORY_COST = int(os.getenv("ARGON2_MEMORY_COST", "19456"))  # KiB
+ARGON2_PARALLELISM = int(os.getenv("ARGON2_PARALLELISM", "1"))
+
+HAS_ARGON2 = importlib.util.find_spec("argon2") is not None
+
+
+def build_password_context(scheme: str = PASSWORD_HASH_SCHEME,
+                           bcrypt_rounds: int = BCRYPT_ROUNDS,
+                           argon2_time_cost: int = ARGON2_TIME_COST,
+                           argon2_memory_cost: int = ARGON2_MEMORY_COST,
+                           argon2_parallelism: int = ARGON2_PARALLELISM) -> CryptContext:
+    """Build a context hashing with the scheme and costs given, verifying every known scheme.
+
+    Minimum and maximum costs equal the target, so needs_update flags any other hash.
+    """
+    if scheme not in ("argon2", "bcrypt"):
+        raise ValueError(f"Unsupported password hash scheme {scheme}")
+    if scheme == "argon2" and not HAS_ARGON2:
+        raise RuntimeError("PASSWORD_HASH_SCHEME=argon2 needs the argon2-cffi package installed")
+    schemes = [scheme] + [other for other in ("argon2", "bcrypt")
+                          if other != scheme and (other != "argon2" or HAS_ARGON2)]
+    return CryptContext(
+        schemes=schemes,
+        deprecated="auto",
+        bcrypt__default_rounds=bcrypt_rounds,
+        bcrypt__min_rounds=bcrypt_rounds,
+        bcrypt__max_rounds=bcrypt_rounds,
+        argon2__type="ID",
+        argon2__default_rounds=argon2_time_cost,
+        argon2__min_rounds=argon2_time_cost,
+        argon2__max_rounds=argon2_time_cost,
+        argon2__memory_cost=argon2_memory_cost,
+        argon2__parallelism=argon2_parallelism,
+    )
+
+
+# Built once per process; worker processes build their own copy on import
+pwd_context = build_password_context()
+
+_pool = None
+_pool_lock = threading.Lock()
+# Slots of the sync routes, the async routes have an asyncio semaphore of their own
+_slots = threading.BoundedSemaphore(PASSWORD_HASH_MAX_PENDING)
+_async_slots = None  # (event loop, asyncio.Semaphore)
+_stats_lock = threading.Lock()
+_in_flight = 0
+_rejected = 0
+
+
+class PasswordHashingBusyError(RuntimeError):
+    """Raised when the password hashing pool has no free slot."""
 
 
 def get_password_context() -> CryptContext:
-    """Hash a password using bcrypt."""
-    return CryptContext(schemes=["bcrypt"], deprecated="auto")
+    """Return the shared password context."""
+    return pwd_context
+
+
+def _hash(password: str) -> str:
+    """Hash a password, executed inside a worker process."""
+    return pwd_context.hash(password)
+
+
+def _verify(password: str, password_hash: str) -> bool:
+    """Verify a password, executed inside a worker process."""
+    return pwd_context.verify(password, password_hash)
+
+
+def _verify_and_update(password: str, password_hash: str) -> tuple[bool, Optional[str]]:
+    """Verify a password and rehash it when needed, executed inside a worker process."""
+    return pwd_context.verify_and_update(password, password_hash)
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    """Create the password hashing process pool on first use."""
+    global _pool  # pylint: disable=global-statement
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ProcessPoolExecutor(max_workers=PASSWORD_HASH_WORKERS)
+    return _pool
+
+
+def _reject():
+    """Count a rejected job and raise the busy error."""
+    global _rejected  # pylint: disable=global-statement
+    with _stats_lock:
+        _rejected += 1
+    raise PasswordHashingBusyError("Too many concurrent login requests, try again later.")
+
+
+def _enter_slot():
+    """Mark a job as in flight once it holds a slot."""
+    global _in_flight  # pylint: disable=global-statement
+    with _stats_lock:
+        _in_flight += 1
+
+
+def _leave_slot():
+    """Mark a job as finished, its caller releases the slot."""
+    global _in_flight  # pylint: disable=global-statement
+    with _stats_lock:
+        _in_flight -= 1
+
+
+def _run_bounded(func, *args):
+    """Run a hashing job in the pool, rejecting it at once when every slot is taken.
+
+    The calling threadpool thread only waits for a job that holds a slot, so at most
+    PASSWORD_HASH_MAX_PENDING threads ever wait on hashing.
+    """
+    if not _slots.acquire(blocking=False):
+        _reject()
+    _enter_slot()
+    try:
+        if PASSWORD_HASH_WORKERS == 0:
+            return func(*args)
+        return _get_pool().submit(func, *args).result()
+    finally:
+        _leave_slot()
+        _slots.release()
+
+
+def _get_async_slots() -> asyncio.Semaphore:
+    """Return the slots of the running event loop, created on first use."""
+    global _async_slots  # pylint: disable=global-statement
+    loop = asyncio.get_running_loop()
+    if _async_slots is None or _async_slots[0] is not loop:
+        _async_slots = (loop, asyncio.Semaphore(PASSWORD_HASH_MAX_PENDING))
+    return _async_slots[1]
+
+
+async def _run_bounded_async(func, *args):
+    """Async variant of _run_bounded, queueing up to PASSWORD_HASH_QUEUE_TIMEOUT for a slot."""
+    slots = _get_async_slots()
+    try:
+        await asyncio.wait_for(slots.acquire(), PASSWORD_HASH_QUEUE_TIMEOUT)
+    except asyncio.TimeoutError:
+        _reject()
+    _enter_slot()
+    try:
+        if PASSWORD_HASH_WORKERS == 0:
+            return await asyncio.to_thread(func, *args)
+        return await asyncio.wrap_future(_get_pool().submit(func, *args))
+    finally:
+        _leave_slot()
+        slots.release()
 
 
 def get_password_hash(password: str) -> str:
-    """Hash a password using bcrypt."""
-    return get_password_context().hash(password)
+    """Hash a password with the configured scheme."""
+    return _run_bounded(_hash, password)
+
+
+def verify_password(password: str, password_hash: str) -> bool:
+    """Verify a password against its hash."""
+    return _run_bounded(_verify, password, password_hash)
+
+
+def verify_and_update_password(password: str,
+                               password_hash: str) -> tuple[bool, Optional[str]]:
+    """Verify a password, also returning a new hash when the stored one is outdated."""
+    return _run_bounded(_verify_and_update, password, password_hash)
+
+
+def hash_passwords(passwords: list[str]) -> list[str]:
+    """Hash a batch of passwords spread over every worker of the pool, for bulk imports.
+
+    Bypasses the request concurrency cap, so large imports compete with logins for CPU.
+    """
+    if PASSWORD_HASH_WORKERS == 0:
+        return [_hash(password) for password in passwords]
+    chunksize = max(1, len(passwords) // (PASSWORD_HASH_WORKERS * 4))
+    return list(_get_pool().map(_hash, passwords, chunksize=chunksize))
+
+
+async def get_password_hash_async(password: str) -> str:
+    """Hash a password with the configured scheme without blocking the event loop."""
+    return await _run_bounded_async(_hash, password)
+
+
+async def verify_password_async(password: str, password_hash: str) -> bool:
+    """Verify a password against its hash without blocking the event loop."""
+    return await _run_bounded_async(_verify, password, password_hash)
+
+
+async def verify_and_update_password_async(password: str,
+                                           password_hash: str) -> tuple[bool, Optional[str]]:
+    """Async variant of verify_and_update_password."""
+    return await _run_bounded_async(_verify_and_update, password, password_hash)
+
+
+def get_password_pool_stats() -> dict:
+    """Return the current load of the password hashing pool."""
+    with _stats_lock:
+        in_flight = _in_flight
+        rejected = _rejected
+    return {
+        "scheme": PASSWORD_HASH_SCHEME,
+        "workers": PASSWORD_HASH_WORKERS,
+        "max_pending": PASSWORD_HASH_MAX_PENDING,
+        "in_flight": in_flight,
+        "queue_depth": max(in_flight - PASSWORD_HASH_WORKERS, 0) if PASSWORD_HASH_WORKERS else 0,
+        "rejected": rejected,
+    }
+
+
+def shutdown_password_pool():
+    """Stop the password hashing worker processes."""
+    global _pool  # pylint: disable=global-statement
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=True)
+            _pool = None
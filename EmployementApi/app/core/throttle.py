@@ -0,0 +1,271 @@
+"""Login throttling for the Employment API: token buckets and failed-attempt lockouts.
+
+Every login attempt takes a token from the bucket of its client IP and of its username,
+an empty bucket rejects the attempt before any database or password hashing work. After
+LOGIN_MAX_FAILURES failed attempts within LOGIN_FAILURE_WINDOW_SECONDS a username is
+locked for LOGIN_LOCKOUT_SECONDS, so attempts on it skip the hash entirely.
+
+State lives in this process by default, each worker then throttles on its own. Setting
+LOGIN_THROTTLE_REDIS_URL shares it between workers and hosts (needs the redis package).
+"""
+import asyncio
+import logging
+import math
+import os
+import threading
+import time
+from typing import Optional
+from app.core.cache import TTLCache
+
+try:
+    import redis
+except ImportError:  # pragma: no cover - only needed for the shared backend
+    redis = None
+
+# Login attempts per second refilled to each client IP, and the burst it may spend at once
+LOGIN_IP_RATE = float(os.getenv("LOGIN_IP_RATE", "1"))
+LOGIN_IP_BURST = float(os.getenv("LOGIN_IP_BURST", "20"))
+# Same for each username, whatever the client; a rate of 0 disables the bucket
+LOGIN_USER_RATE = float(os.getenv("LOGIN_USER_RATE", "0.1"))
+LOGIN_USER_BURST = float(os.getenv("LOGIN_USER_BURST", "5"))
+# Failed attempts on a username that lock it, 0 disables the lockout
+LOGIN_MAX_FAILURES = int(os.getenv("LOGIN_MAX_FAILURES", "10"))
+LOGIN_FAILURE_WINDOW_SECONDS = float(os.getenv("LOGIN_FAILURE_WINDOW_SECONDS", "900"))
+LOGIN_LOCKOUT_SECONDS = float(os.getenv("LOGIN_LOCKOUT_SECONDS", "900"))
+# Keys (IPs and usernames) tracked by the in-process backend, least recently used go first
+LOGIN_THROTTLE_SIZE = int(os.getenv("LOGIN_THROTTLE_SIZE", "65536"))
+LOGIN_THROTTLE_REDIS_URL = os.getenv("LOGIN_THROTTLE_REDIS_URL", "")
+
+logger = logging.getLogger(__name__)
+
+
+class LoginThrottledError(RuntimeError):
+    """Raised when a login attempt is over its rate or targets a locked account."""
+
+    def __init__(self, message: str, retry_after: float):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+    def retry_after_header(self) -> str:
+        """Return the Retry-After header value, in whole seconds."""
+        return str(max(1, math.ceil(self.retry_after)))
+
+
+class MemoryThrottleBackend:
+    """Token buckets, failure counters and locks of this process, in bounded TTL caches.
+
+    A bucket expires once it would have refilled, so a missing bucket is a full one.
+    """
+
+    blocking = False
+
+    def __init__(self, maxsize: int = LOGIN_THROTTLE_SIZE):
+        self._lock = threading.Lock()
+        self._buckets = TTLCache(maxsize=maxsize, ttl=0)  # key -> (tokens, updated_at)
+        self._failures = TTLCache(maxsize=maxsize, ttl=0)  # key -> failed attempts
+        self._locks = TTLCache(maxsize=maxsize, ttl=0)  # key -> locked until
+
+    def take(self, key: str, rate: float, burst: float) -> float:
+        """Take a token from a bucket, returning 0 or the seconds until one is available."""
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated_at = self._buckets.get(key, (burst, now))
+            tokens = min(burst, tokens + (now - updated_at) * rate)
+            wait = 0.0 if tokens >= 1 else (1 - tokens) / rate
+            if not wait:
+                tokens -= 1
+            self._buckets.set(key, (tokens, now), ttl=(burst - tokens) / rate)
+        return wait
+
+    def add_failure(self, key: str, window: float) -> int:
+        """Count a failed attempt, returning the failures within the window so far."""
+        with self._lock:
+            failures = self._failures.get(key, 0) + 1
+            self._failures.set(key, failures, ttl=window)
+        return failures
+
+    def clear_failures(self, key: str):
+        """Forget the failed attempts of a key."""
+        self._failures.pop(key)
+
+    def lock(self, key: str, seconds: float):
+        """Lock a key for a number of seconds."""
+        self._locks.set(key, time.monotonic() + seconds, ttl=seconds)
+
+    def locked_for(self, key: str) -> float:
+        """Return the seconds a key stays locked, 0 when it is not."""
+        locked_until = self._locks.get(key)
+        return max(0.0, locked_until - time.monotonic()) if locked_until else 0.0
+
+    def stats(self) -> dict:
+        """Return how many buckets, failure counters and locks are held."""
+        return {"buckets": self._buckets.stats()["size"],
+                "failures": self._failures.stats()["size"],
+                "locks": self._locks.stats()["size"]}
+
+
+# Refill and take from a bucket atomically, on the clock of the Redis server
+TOKEN_BUCKET_SCRIPT = """
+local rate, burst = tonumber(ARGV[1]), tonumber(ARGV[2])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'updated_at')
+local tokens = tonumber(state[1]) or burst
+local updated_at = tonumber(state[2]) or now
+tokens = math.min(burst, tokens + (now - updated_at) * rate)
+local wait = 0
+if tokens >= 1 then tokens = tokens - 1 else wait = (1 - tokens) / rate end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'updated_at', tostring(now))
+redis.call('PEXPIRE', KEYS[1], math.ceil((burst - tokens) / rate * 1000) + 1)
+return tostring(wait)
+"""
+
+
+class RedisThrottleBackend:
+    """The MemoryThrottleBackend operations on a Redis server shared by every worker."""
+
+    blocking = True
+
+    def __init__(self, url: str, prefix: str = "login-throttle:"):
+        if redis is None:
+            raise RuntimeError("LOGIN_THROTTLE_REDIS_URL needs the redis package installed")
+        self._redis = redis.Redis.from_url(url, socket_timeout=0.5)
+        self._take = self._redis.register_script(TOKEN_BUCKET_SCRIPT)
+        self.prefix = prefix
+
+    def take(self, key: str, rate: float, burst: float) -> float:
+        """Take a token from a bucket, returning 0 or the seconds until one is available."""
+        return float(self._take(keys=[f"{self.prefix}bucket:{key}"], args=[rate, burst]))
+
+    def add_failure(self, key: str, window: float) -> int:
+        """Count a failed attempt, returning the failures within the window so far."""
+        name = f"{self.prefix}failures:{key}"
+        failures = self._redis.incr(name)
+        if failures == 1:
+            self._redis.pexpire(name, math.ceil(window * 1000))
+        return failures
+
+    def clear_failures(self, key: str):
+        """Forget the failed attempts of a key."""
+        self._redis.delete(f"{self.prefix}failures:{key}")
+
+    def lock(self, key: str, seconds: float):
+        """Lock a key for a number of seconds."""
+        self._redis.set(f"{self.prefix}lock:{key}", 1, px=math.ceil(seconds * 1000))
+
+    def locked_for(self, key: str) -> float:
+        """Return the seconds a key stays locked, 0 when it is not."""
+        ttl = self._redis.pttl(f"{self.prefix}lock:{key}")
+        return ttl / 1000 if ttl > 0 else 0.0
+
+    def stats(self) -> dict:
+        """Return the Redis server the state is shared on."""
+        kwargs = self._redis.connection_pool.connection_kwargs
+        return {"redis": f"{kwargs.get('host')}:{kwargs.get('port')}/{kwargs.get('db')}"}
+
+
+class LoginThrottle:
+    """Rate limits and lockouts applied to login attempts, on top of a throttle backend.
+
+    A failing backend lets attempts through, the password hashing pool still caps the
+    CPU spent on them.
+    """
+
+    def __init__(self, backend, ip_rate: float = LOGIN_IP_RATE, ip_burst: float = LOGIN_IP_BURST,
+                 user_rate: float = LOGIN_USER_RATE, user_burst: float = LOGIN_USER_BURST,
+                 max_failures: int = LOGIN_MAX_FAILURES,
+                 failure_window: float = LOGIN_FAILURE_WINDOW_SECONDS,
+                 lockout_seconds: float = LOGIN_LOCKOUT_SECONDS):
+        self.backend = backend
+        self.ip_rate = ip_rate
+        self.ip_burst = ip_burst
+        self.user_rate = user_rate
+        self.user_burst = user_burst
+        self.max_failures = max_failures
+        self.failure_window = failure_window
+        self.lockout_seconds = lockout_seconds
+        self._stats_lock = threading.Lock()
+        self._counts = {"allowed": 0, "rate_limited": 0, "locked_out": 0, "lockouts": 0,
+                        "backend_errors": 0}
+
+    def _count(self, name: str):
+        """Increment a counter of the stats."""
+        with self._stats_lock:
+            self._counts[name] += 1
+
+    def check(self, client_ip: Optional[str], username: str):
+        """Let a login attempt through or raise LoginThrottledError."""
+        try:
+            locked_for = self.backend.locked_for(f"user:{username}") if self.max_failures else 0
+            if locked_for:
+                self._count("locked_out")
+                raise LoginThrottledError(
+                    "Too many failed login attempts, account temporarily locked.", locked_for)
+            for key, rate, burst in ((f"ip:{client_ip}", self.ip_rate, self.ip_burst),
+                                     (f"user:{username}", self.user_rate, self.user_burst)):
+                wait = self.backend.take(key, rate, burst) if rate > 0 else 0.0
+                if wait:
+                    self._count("rate_limited")
+                    raise LoginThrottledError("Too many login attempts, try again later.", wait)
+        except LoginThrottledError:
+            raise
+        except Exception:  # pylint: disable=broad-except
+            self._count("backend_errors")
+            logger.exception("Login throttle check failed")
+        self._count("allowed")
+
+    def record_failure(self, username: str):
+        """Count a failed login, locking the username once it reaches max_failures."""
+        if not self.max_failures:
+            return
+        key = f"user:{username}"
+        try:
+            if self.backend.add_failure(key, self.failure_window) >= self.max_failures:
+                self.backend.lock(key, self.lockout_seconds)
+                self.backend.clear_failures(key)
+                self._count("lockouts")
+        except Exception:  # pylint: disable=broad-except
+            self._count("backend_errors")
+            logger.exception("Login throttle failure count failed")
+
+    def record_success(self, username: str):
+        """Reset the failed login count of a username."""
+        if not self.max_failures:
+            return
+        try:
+            self.backend.clear_failures(f"user:{username}")
+        except Exception:  # pylint: disable=broad-except
+            self._count("backend_errors")
+            logger.exception("Login throttle failure reset failed")
+
+    async def _run_async(self, func, *args):
+        """Run a method off the event loop when the backend does network round trips."""
+        if self.backend.blocking:
+            return await asyncio.to_thread(func, *args)
+        return func(*args)
+
+    async def check_async(self, client_ip: Optional[str], username: str):
+        """Async variant of check."""
+        await self._run_async(self.check, client_ip, username)
+
+    async def record_failure_async(self, username: str):
+        """Async variant of record_failure."""
+        await self._run_async(self.record_failure, username)
+
+    async def record_success_async(self, username: str):
+        """Async variant of record_success."""
+        await self._run_async(self.record_success, username)
+
+    def stats(self) -> dict:
+        """Return the attempt counters and the state held by the backend."""
+        with self._stats_lock:
+            counts = dict(self._counts)
+        try:
+            counts.update(self.backend.stats())
+        except Exception:  # pylint: disable=broad-except
+            counts["backend"] = "unavailable"
+        return counts
+
+
+login_throttle = LoginThrottle(RedisThrottleBackend(LOGIN_THROTTLE_REDIS_URL)
+                               if LOGIN_THROTTLE_REDIS_URL else MemoryThrottleBackend())
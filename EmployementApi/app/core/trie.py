@@ -0,0 +1,42 @@
+"""Prefix trie used for in-memory typeahead lookups in the Employment API."""
+
+
+class PrefixTrie:
+    """Trie mapping lower-cased keys to the ids of the items they belong to.
+
+    Keys are inserted with a kind, e.g. full name or email, and every node keeps the
+    first ``node_size`` ids inserted through it of each kind, so items should be inserted
+    in rank order and a lookup never walks the subtree. Capping each kind on its own keeps
+    the best matches of a kind from being crowded out by the many matches of another.
+    Keys are only indexed up to ``max_depth`` characters; nodes at that depth keep every
+    id, and callers filter those candidates against the full keys.
+    """
+
+    def __init__(self, node_size: int = 50, max_depth: int = 8):
+        self.node_size = node_size
+        self.max_depth = max_depth
+        self._root = ({}, {})  # (children by character, ids by kind)
+
+    def insert(self, key: str, item_id, kind: int = 0):
+        """Index a key of an item, all keys of one item must be inserted one after another."""
+        node = self._root
+        for depth, char in enumerate(key.lower()[:self.max_depth], start=1):
+            node = node[0].setdefault(char, ({}, {}))
+            ids = node[1].setdefault(kind, [])
+            # Keys of the same item share prefixes, record the item once per node and kind
+            if (depth == self.max_depth or len(ids) < self.node_size) and \
+                    (not ids or ids[-1] != item_id):
+                ids.append(item_id)
+
+    def search(self, prefix: str) -> list:
+        """Return the candidate ids of items having a key that may start with the prefix.
+
+        Candidates come by kind, lowest first, each id once.
+        """
+        node = self._root
+        for char in prefix.lower()[:self.max_depth]:
+            node = node[0].get(char)
+            if node is None:
+                return []
+        return list(dict.fromkeys(
+            item_id for kind in sorted(node[1]) for item_id in node[1][kind]))
@@ -1,10 +1,37 @@
 """This is the CRUD operations for employee registration in the Employment API."""
+import os
+import re
+from typing import Optional
+from sqlalchemy import func, insert, or_, select, update
+from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import Session
-from app.core.security import get_password_context, get_password_hash
+from app.core.cache import TTLCache
+from app.core.pagination import decode_cursor, encode_cursor
+from app.core.security import (PasswordHashingBusyError, get_password_hash,
+                               verify_and_update_password)
 from app.core.jwt_handle import create_access_token, create_refresh_token
+from app.crud.task import parse_datetime
 from app.models.enums import UserRoleNumber, get_user_role_number
-from app.models.user import User
-from app.schemas.user import UserCreate, UserOut, UserLogin, TokenResponse
+from app.models.user import EMPLOYEE_ID_START, User
+from app.schemas.user import Principal, UserCreate, UserOut, UserLogin, TokenResponse
+
+USER_CACHE_SIZE = int(os.getenv("USER_CACHE_SIZE", "2048"))
+USER_CACHE_TTL_SECONDS = float(os.getenv("USER_CACHE_TTL_SECONDS", "60"))
+
+# Principal rows (id, email, user_role, is_active) read by get_principal, stored under
+# ("id", id) and ("email", email). Changes made by this worker invalidate them at once,
+# those of other workers show after USER_CACHE_TTL_SECONDS
+user_cache = TTLCache(maxsize=USER_CACHE_SIZE, ttl=USER_CACHE_TTL_SECONDS)
+
+# Columns of UserOut, the only ones the employee listing reads
+EMPLOYEE_COLUMNS = (User.id, User.employee_id, User.email, User.full_name, User.user_role)
+# Lower-cased name and email in byte order, the expressions of the prefix search indexes
+EMPLOYEE_NAME_KEY = func.lower(User.full_name).collate("C")
+EMPLOYEE_EMAIL_KEY = func.lower(User.email).collate("C")
+
+
+class InvalidCredentialsError(ValueError):
+    """Raised by login_user for an unknown username or a wrong password."""
 
 
 def register_user(db: Session, user_in: UserCreate) -> UserOut:
@@ -15,26 +42,35 @@ def register_user(db: Session, user_in: UserCreate) -> UserOut:
         if existing_user:
             raise ValueError("User with this email already exists.")
 
-        db_user = User(
+        # employee_id comes from users_employee_id_seq; RETURNING hands back the generated
+        # ids, so there is no refresh SELECT after the commit
+        stmt = insert(User).values(
             email=user_in.email,
             username=user_in.username,
             password_hash=get_password_hash(user_in.password),
-            date_of_birth=user_in.date_of_birth,
+            date_of_birth=parse_datetime(user_in.date_of_birth),
             full_name=user_in.employee_name,
             phone_number=user_in.phone_number,
-            user_role=get_user_role_number(user_in.role),
-            employee_id=get_employee_id(db)
+            user_role=get_user_role_number(user_in.role)
         )
-        db.add(db_user)
+        employee_ids = allocate_employee_ids(db, 1)
+        if employee_ids is not None:
+            stmt = stmt.values(employee_id=employee_ids[0])
+        db_user = db.execute(stmt.returning(
+            User.id, User.employee_id, User.email, User.full_name, User.user_role)).one()
         db.commit()
-        db.refresh(db_user)
+        invalidate_user(user_id=db_user.id, email=db_user.email)
         output_user = UserOut(
+            id=db_user.id,
             employee_id=db_user.employee_id,
             email=db_user.email,
             full_name=db_user.full_name,
             user_role=db_user.user_role
         )
         return output_user
+    except PasswordHashingBusyError:
+        db.rollback()
+        raise
     except Exception as e:
         db.rollback()
         raise ValueError(
@@ -47,24 +83,76 @@ def login_user(db: Session, login_data: UserLogin) -> TokenResponse:
         existing_user = db.query(User).filter_by(
             username=login_data.username).first()
         if not existing_user:
-            raise ValueError("User does not exists.")
-        if not get_password_context().verify(login_data.password, existing_user.password_hash):
-            raise ValueError("Incorrect password.")
+            raise InvalidCredentialsError("Login failed: User does not exists.")
+        verified, new_hash = verify_and_update_password(
+            login_data.password, existing_user.password_hash)
+        if not verified:
+            raise InvalidCredentialsError("Login failed: Incorrect password.")
+        if new_hash is not None:
+            rehash_password(db, existing_user.id, existing_user.password_hash, new_hash)
+        claims = get_user_claims(existing_user)
         return TokenResponse(
             id=existing_user.id,
-            jwt=create_access_token({"sub": existing_user.email}),
-            refresh_token=create_refresh_token({"sub": existing_user.email})
+            jwt=create_access_token(claims),
+            refresh_token=create_refresh_token(claims)
         )
+    except (PasswordHashingBusyError, InvalidCredentialsError):
+        raise
     except Exception as e:
         raise ValueError(f"Login failed: {str(e)}") from e
 
 
-def get_employee_id(db: Session) -> int:
-    """Generate a unique employee ID."""
-    last_user = db.query(User).order_by(User.id.desc()).first()
-    if last_user:
-        return last_user.employee_id + 1
-    return 10000  # Starting employee ID from 10000
+def build_rehash_statement(user_id: int, old_hash: str, new_hash: str):
+    """Build the update storing a hash made with the current settings.
+
+    It only applies while the old hash is stored, so a password changed meanwhile is kept,
+    and modified_at is left alone as the user's data did not change.
+    """
+    return update(User).where(User.id == user_id, User.password_hash == old_hash).values(
+        password_hash=new_hash, modified_at=User.modified_at)
+
+
+def rehash_password(db: Session, user_id: int, old_hash: str, new_hash: str):
+    """Replace an outdated password hash after a successful login."""
+    try:
+        db.execute(build_rehash_statement(user_id, old_hash, new_hash),
+                   execution_options={"synchronize_session": False})
+        db.commit()
+        invalidate_user(user_id=user_id)
+    except SQLAlchemyError:
+        # The login stands with the old hash, the next one retries
+        db.rollback()
+
+
+def allocate_employee_ids(db: Session, count: int) -> Optional[list[int]]:
+    """Return employee ids for new users on databases without sequences.
+
+    Returns None on Postgres, where users_employee_id_seq fills employee_id. Elsewhere the
+    ids follow the highest one taken, which is only safe with serialized writers (SQLite).
+    """
+    if db.get_bind().dialect.supports_sequences:
+        return None
+    last_id = db.scalar(select(func.max(User.employee_id)))
+    start = EMPLOYEE_ID_START if last_id is None else last_id + 1
+    return list(range(start, start + count))
+
+
+def get_user_claims(user: User) -> dict:
+    """Build the JWT claims identifying a user, so requests need no user lookup."""
+    return {"sub": user.email, "uid": user.id, "role": user.user_role,
+            "ver": user.token_version or 0}
+
+
+def invalidate_user(user_id: int = None, email: str = None):
+    """Drop a user from the cache, to be called after any change to the user row."""
+    if user_id is not None:
+        cached = user_cache.pop(("id", user_id))
+        if cached is not None:
+            user_cache.pop(("email", cached.email))
+    if email is not None:
+        cached = user_cache.pop(("email", email))
+        if cached is not None:
+            user_cache.pop(("id", cached.id))
 
 
 def get_user_by_email(db: Session, email: str) -> UserOut:
@@ -81,16 +169,92 @@ def get_user_by_email(db: Session, email: str) -> UserOut:
     )
 
 
-def get_all_employees(db: Session) -> list[UserOut]:
-    """Retrieve all employees."""
-    users = db.query(User).filter_by(
-        user_role=UserRoleNumber.EMPLOYEE.value).all()
-    if not users:
-        raise ValueError("No employees found.")
-    return [UserOut(
-        id=user.id,
-        employee_id=user.employee_id,
-        email=user.email,
-        full_name=user.full_name,
-        user_role=user.user_role
-    ) for user in users]
+def build_principal_query(user_id: Optional[int] = None, email: Optional[str] = None):
+    """Build the select of a user's identity, role and status, by id or else by email."""
+    stmt = select(User.id, User.email, User.user_role, User.is_active)
+    if user_id is not None:
+        return stmt.where(User.id == user_id)
+    return stmt.where(User.email == email)
+
+
+def get_cached_principal(user_id: Optional[int] = None, email: Optional[str] = None):
+    """Return the cached principal row of a user, by id or else by email, or None."""
+    return user_cache.get(("id", user_id) if user_id is not None else ("email", email))
+
+
+def cache_principal(row):
+    """Cache a principal row under its id and email, rows of missing users are skipped."""
+    if row is not None:
+        user_cache.set(("id", row.id), row)
+        user_cache.set(("email", row.email), row)
+    return row
+
+
+def to_principal(row) -> Principal:
+    """Map a user row to a Principal, rejecting missing and deactivated users."""
+    if row is None:
+        raise ValueError("User not found.")
+    if row.is_active == 0:
+        raise ValueError("User is inactive.")
+    return Principal(id=row.id, email=row.email, user_role=row.user_role)
+
+
+def get_principal(db: Session, user_id: Optional[int] = None,
+                  email: Optional[str] = None) -> Principal:
+    """Read the current role and status of a user, through user_cache.
+
+    Deactivated users are cached too, so they keep being rejected without a query.
+    """
+    row = get_cached_principal(user_id, email)
+    if row is None:
+        row = cache_principal(db.execute(build_principal_query(user_id, email)).first())
+    return to_principal(row)
+
+
+def escape_like(value: str) -> str:
+    """Escape the LIKE wildcards typed by a user, to be used with escape="\\"."""
+    return re.sub(r"([\\%_])", r"\\\1", value)
+
+
+def build_employees_query(limit: int = 100, cursor: Optional[str] = None,
+                          search: Optional[str] = None):
+    """Build the select for a keyset-paginated page of employees, projected to UserOut.
+
+    ``search`` matches the start of the full name or email, case-insensitively.
+    """
+    stmt = select(*EMPLOYEE_COLUMNS).where(
+        User.user_role == UserRoleNumber.EMPLOYEE.value).order_by(User.id)
+    if search:
+        pattern = escape_like(search.lower()) + "%"
+        stmt = stmt.where(or_(EMPLOYEE_NAME_KEY.like(pattern, escape="\\"),
+                              EMPLOYEE_EMAIL_KEY.like(pattern, escape="\\")))
+    if cursor:
+        stmt = stmt.where(User.id > decode_cursor(cursor))
+    # Fetch one extra row to know whether another page exists
+    return stmt.limit(limit + 1)
+
+
+def to_employee_page(rows, limit: int):
+    """Map employee rows fetched with limit + 1 to a page of UserOut and its next cursor."""
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1].id) if rows else None
+    employees = [UserOut(
+        id=row.id,
+        employee_id=row.employee_id,
+        email=row.email,
+        full_name=row.full_name,
+        user_role=row.user_role
+    ) for row in rows]
+    return employees, next_cursor
+
+
+def get_all_employees(db: Session, limit: int = 100, cursor: Optional[str] = None,
+                      search: Optional[str] = None):
+    """Retrieve a page of employees, together with the cursor for the next page.
+
+    Only the UserOut columns are selected; an empty page is returned when nothing matches.
+    """
+    stmt = build_employees_query(limit=limit, cursor=cursor, search=search)
+    return to_employee_page(db.execute(stmt).all(), limit)
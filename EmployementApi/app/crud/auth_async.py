@@ -0,0 +1,122 @@
+"""Async CRUD operations for employee registration, used when USE_ASYNC_DB is enabled."""
+from typing import Optional
+from sqlalchemy import insert, select
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.security import (PasswordHashingBusyError, get_password_hash_async,
+                               verify_and_update_password_async)
+from app.core.jwt_handle import create_access_token, create_refresh_token
+from app.crud.auth import (InvalidCredentialsError, allocate_employee_ids,
+                           build_employees_query, build_principal_query, build_rehash_statement,
+                           cache_principal, get_cached_principal, get_user_claims,
+                           invalidate_user, to_employee_page, to_principal)
+from app.crud import employee_search
+from app.crud.task import parse_datetime
+from app.models.enums import get_user_role_number
+from app.models.user import User
+from app.schemas.user import Principal, UserCreate, UserOut, UserLogin, TokenResponse
+
+
+async def register_user(db: AsyncSession, user_in: UserCreate) -> UserOut:
+    """Register a new user in the database."""
+    try:
+        # Check if the user already exists
+        existing_user = await db.scalar(
+            select(User.id).where(User.email == user_in.email).limit(1))
+        if existing_user:
+            raise ValueError("User with this email already exists.")
+
+        # employee_id comes from users_employee_id_seq; RETURNING hands back the generated
+        # ids, so there is no refresh SELECT after the commit
+        stmt = insert(User).values(
+            email=user_in.email,
+            username=user_in.username,
+            password_hash=await get_password_hash_async(user_in.password),
+            date_of_birth=parse_datetime(user_in.date_of_birth),
+            full_name=user_in.employee_name,
+            phone_number=user_in.phone_number,
+            user_role=get_user_role_number(user_in.role)
+        )
+        employee_ids = await db.run_sync(allocate_employee_ids, 1)
+        if employee_ids is not None:
+            stmt = stmt.values(employee_id=employee_ids[0])
+        db_user = (await db.execute(stmt.returning(
+            User.id, User.employee_id, User.email, User.full_name, User.user_role))).one()
+        await db.commit()
+        invalidate_user(user_id=db_user.id, email=db_user.email)
+        return UserOut(
+            id=db_user.id,
+            employee_id=db_user.employee_id,
+            email=db_user.email,
+            full_name=db_user.full_name,
+            user_role=db_user.user_role
+        )
+    except PasswordHashingBusyError:
+        await db.rollback()
+        raise
+    except Exception as e:
+        await db.rollback()
+        raise ValueError(
+            f"An error occurred while registering the user: {str(e)}") from e
+
+
+async def login_user(db: AsyncSession, login_data: UserLogin) -> TokenResponse:
+    """Verify the credentials of a user and issue its tokens."""
+    try:
+        existing_user = await db.scalar(
+            select(User).where(User.username == login_data.username).limit(1))
+        if not existing_user:
+            raise InvalidCredentialsError("Login failed: User does not exists.")
+        verified, new_hash = await verify_and_update_password_async(
+            login_data.password, existing_user.password_hash)
+        if not verified:
+            raise InvalidCredentialsError("Login failed: Incorrect password.")
+        if new_hash is not None:
+            await rehash_password(db, existing_user.id, existing_user.password_hash, new_hash)
+        claims = get_user_claims(existing_user)
+        return TokenResponse(
+            id=existing_user.id,
+            jwt=create_access_token(claims),
+            refresh_token=create_refresh_token(claims)
+        )
+    except (PasswordHashingBusyError, InvalidCredentialsError):
+        raise
+    except Exception as e:
+        raise ValueError(f"Login failed: {str(e)}") from e
+
+
+async def rehash_password(db: AsyncSession, user_id: int, old_hash: str, new_hash: str):
+    """Replace an outdated password hash after a successful login."""
+    try:
+        await db.execute(build_rehash_statement(user_id, old_hash, new_hash),
+                         execution_options={"synchronize_session": False})
+        await db.commit()
+        invalidate_user(user_id=user_id)
+    except SQLAlchemyError:
+        # The login stands with the old hash, the next one retries
+        await db.rollback()
+
+
+async def get_principal(db: AsyncSession, user_id: Optional[int] = None,
+                        email: Optional[str] = None) -> Principal:
+    """Read the current role and status of a user, see crud.auth.get_principal."""
+    row = get_cached_principal(user_id, email)
+    if row is None:
+        row = cache_principal((await db.execute(build_principal_query(user_id, email))).first())
+    return to_principal(row)
+
+
+async def get_all_employees(db: AsyncSession, limit: int = 100, cursor: Optional[str] = None,
+                            search: Optional[str] = None):
+    """Retrieve a page of employees, see crud.auth.get_all_employees."""
+    stmt = build_employees_query(limit=limit, cursor=cursor, search=search)
+    return to_employee_page((await db.execute(stmt)).all(), limit)
+
+
+async def search_employees(db: AsyncSession, q: str, limit: int = 10) -> list[UserOut]:
+    """Return employees matching a typeahead query, see crud.employee_search.search_employees."""
+    if db.bind.dialect.name != "postgresql":
+        return await db.run_sync(employee_search.search_employees, q, limit)
+    limit = min(limit, employee_search.EMPLOYEE_SEARCH_MAX_RESULTS)
+    stmt = employee_search.build_employee_search_query(q, limit)
+    return employee_search.unique_employees(await db.execute(stmt), limit)
@@ -0,0 +1,161 @@
+"""Employee typeahead search for the task assignment picker."""
+import os
+import re
+import threading
+import time
+from sqlalchemy import Float, Integer, cast, func, literal, select, union_all
+from sqlalchemy.orm import Session
+from app.core.trie import PrefixTrie
+from app.crud.auth import EMPLOYEE_COLUMNS, EMPLOYEE_EMAIL_KEY, EMPLOYEE_NAME_KEY, escape_like
+from app.models.enums import UserRoleNumber
+from app.models.user import User
+from app.schemas.user import UserOut
+
+# Most results a typeahead request can ask for
+EMPLOYEE_SEARCH_MAX_RESULTS = 20
+# Shorter queries only match prefixes, trigram matching needs at least three characters
+TRIGRAM_MIN_LENGTH = 3
+# How long the in-memory index used without Postgres serves before it is rebuilt
+EMPLOYEE_SEARCH_INDEX_TTL_SECONDS = float(os.getenv("EMPLOYEE_SEARCH_INDEX_TTL_SECONDS", "60"))
+
+
+def build_employee_search_query(q: str, limit: int = 10):
+    """Build the Postgres select of the best employees matching a typeahead query.
+
+    Names starting with the query rank first, then emails starting with it, then names
+    and emails containing it, nearest by word similarity. Every branch is read in index
+    order and stops after ``limit`` rows, however many employees match. An employee can
+    come back from several branches, callers keep the first row of each.
+    """
+    q = q.strip().lower()
+    prefix = escape_like(q) + "%"
+    is_employee = User.user_role == UserRoleNumber.EMPLOYEE.value
+    no_distance = cast(0, Float)
+    branches = [
+        select(*EMPLOYEE_COLUMNS, literal(rank, Integer).label("rank"),
+               no_distance.label("distance"), EMPLOYEE_NAME_KEY.label("sort_key"))
+        .where(is_employee, key.like(prefix, escape="\\"))
+        .order_by(key, User.id).limit(limit)
+        for rank, key in ((0, EMPLOYEE_NAME_KEY), (1, EMPLOYEE_EMAIL_KEY))
+    ]
+    if len(q) >= TRIGRAM_MIN_LENGTH:
+        contains = "%" + prefix
+        for rank, column in ((2, User.full_name), (3, User.email)):
+            key = func.lower(column)
+            # pg_trgm word similarity distance, served nearest first by the GiST index
+            distance = literal(q).op("<<->", return_type=Float)(key)
+            branches.append(
+                select(*EMPLOYEE_COLUMNS, literal(rank, Integer).label("rank"),
+                       distance.label("distance"), EMPLOYEE_NAME_KEY.label("sort_key"))
+                .where(is_employee, key.like(contains, escape="\\"))
+                .order_by(distance).limit(limit))
+    matches = union_all(*branches).subquery()
+    return select(*(matches.c[column.key] for column in EMPLOYEE_COLUMNS)).order_by(
+        matches.c.rank, matches.c.distance, matches.c.sort_key, matches.c.id)
+
+
+def row_to_employee(row) -> UserOut:
+    """Map a row selected with EMPLOYEE_COLUMNS to the user schema."""
+    return UserOut(
+        id=row.id,
+        employee_id=row.employee_id,
+        email=row.email,
+        full_name=row.full_name,
+        user_role=row.user_role
+    )
+
+
+def _search_keys(full_name: str, email: str) -> list:
+    """Return the lower-cased keys an employee can be found by: name, its words, email."""
+    full_name, email = (full_name or "").lower(), (email or "").lower()
+    words = [word for word in re.split(r"[\s._@-]+", full_name) if word]
+    return list(dict.fromkeys([full_name, *words, email]))
+
+
+class EmployeeSearchIndex:
+    """In-memory prefix trie of the employees, the search backend without Postgres.
+
+    The index is built from the users table on first use and rebuilt once it is older
+    than EMPLOYEE_SEARCH_INDEX_TTL_SECONDS, so new employees show up after that delay.
+    """
+
+    def __init__(self, ttl: float = EMPLOYEE_SEARCH_INDEX_TTL_SECONDS):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._trie = None
+        self._employees = {}  # id -> (UserOut, search keys)
+        self._built_at = 0.0
+
+    def is_stale(self) -> bool:
+        """Whether the index has to be (re)built before serving a search."""
+        return self._trie is None or time.monotonic() - self._built_at > self.ttl
+
+    def build(self, rows):
+        """Replace the index with the given employee rows, selected with EMPLOYEE_COLUMNS."""
+        trie = PrefixTrie(node_size=EMPLOYEE_SEARCH_MAX_RESULTS * 2)
+        employees = {}
+        # Insert in rank order, the trie keeps the first ids of each kind reaching a node.
+        # Kinds follow the ranking of search: full name, email, then the words of the name
+        for row in sorted(rows, key=lambda row: ((row.full_name or "").lower(), row.id)):
+            keys = _search_keys(row.full_name, row.email)
+            employees[row.id] = (row_to_employee(row), keys)
+            for position, key in enumerate(keys):
+                kind = 0 if position == 0 else 1 if position == len(keys) - 1 else 2
+                trie.insert(key, row.id, kind)
+        with self._lock:
+            self._trie, self._employees = trie, employees
+            self._built_at = time.monotonic()
+
+    def invalidate(self):
+        """Drop the index, the next search rebuilds it."""
+        with self._lock:
+            self._trie = None
+
+    def search(self, q: str, limit: int = 10) -> list[UserOut]:
+        """Return the best employees having a name, name word or email starting with q."""
+        q = q.strip().lower()
+        with self._lock:
+            trie, employees = self._trie, self._employees
+        if trie is None or not q:
+            return []
+        matches = []
+        for item_id in trie.search(q):
+            employee, keys = employees[item_id]
+            if any(key.startswith(q) for key in keys):
+                name = keys[0]
+                matches.append(((not name.startswith(q), not keys[-1].startswith(q),
+                                 name, item_id), employee))
+        matches.sort(key=lambda match: match[0])
+        return [employee for _, employee in matches[:limit]]
+
+
+employee_index = EmployeeSearchIndex()
+
+
+def build_employee_index_query():
+    """Build the select of every employee, used to fill the in-memory index."""
+    return select(*EMPLOYEE_COLUMNS).where(User.user_role == UserRoleNumber.EMPLOYEE.value)
+
+
+def unique_employees(rows, limit: int) -> list[UserOut]:
+    """Map ranked search rows to at most ``limit`` employees, keeping each one's best row."""
+    employees = {}
+    for row in rows:
+        if row.id not in employees:
+            employees[row.id] = row_to_employee(row)
+            if len(employees) == limit:
+                break
+    return list(employees.values())
+
+
+def search_employees(db: Session, q: str, limit: int = 10) -> list[UserOut]:
+    """Return up to ``limit`` employees matching a typeahead query, best matches first.
+
+    Postgres uses the prefix and trigram indexes, other databases the in-memory trie.
+    """
+    limit = min(limit, EMPLOYEE_SEARCH_MAX_RESULTS)
+    if db.get_bind().dialect.name == "postgresql":
+        return unique_employees(db.execute(build_employee_search_query(q, limit)), limit)
+    if employee_index.is_stale():
+        employee_index.build(db.execute(build_employee_index_query()).all())
+    return employee_index.search(q, limit)
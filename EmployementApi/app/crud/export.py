@@ -0,0 +1,85 @@
+"""Streaming export of tasks and employees as NDJSON or CSV."""
+import csv
+import io
+import json
+import os
+from datetime import date, datetime
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from app.crud.auth import EMPLOYEE_COLUMNS
+from app.crud.task import TASK_COLUMNS, apply_task_filters
+from app.models.enums import UserRoleNumber
+from app.models.task import Task
+from app.models.user import User
+
+# Media type of every export format
+EXPORT_FORMATS = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+# Rows fetched from the server-side cursor, and written to the response, at a time
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", "1000"))
+
+# Plain columns rather than ORM entities, so no objects are built or tracked per row
+TASK_EXPORT_COLUMNS = TASK_COLUMNS + (
+    Task.created_at, Task.modified_at, User.full_name.label("assigned_to_name"))
+# The UserOut fields of /auth/get_employees, every logged-in user may export them
+EMPLOYEE_EXPORT_COLUMNS = EMPLOYEE_COLUMNS
+
+
+def get_media_type(fmt: str) -> str:
+    """Return the media type of an export format, checked before the response starts."""
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unsupported export format '{fmt}', use ndjson or csv.")
+    return EXPORT_FORMATS[fmt]
+
+
+def build_task_export_query(**filters):
+    """Build the select of every task matching the filters, see crud.task.apply_task_filters."""
+    return apply_task_filters(select(*TASK_EXPORT_COLUMNS).outerjoin(
+        User, Task.assigned_to == User.id).order_by(Task.id), **filters)
+
+
+def build_employee_export_query():
+    """Build the select of every employee."""
+    return select(*EMPLOYEE_EXPORT_COLUMNS).where(
+        User.user_role == UserRoleNumber.EMPLOYEE.value).order_by(User.id)
+
+
+def _json_default(value):
+    """Serialize the values json does not know, timestamps as ISO strings."""
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"Cannot serialize {type(value).__name__}")
+
+
+def format_header(columns, fmt: str) -> str:
+    """Return the text written before the first row, the header line for CSV."""
+    if fmt != "csv":
+        return ""
+    return format_rows([columns], columns, fmt)
+
+
+def format_rows(rows, columns, fmt: str) -> str:
+    """Render a batch of rows as NDJSON lines or CSV records."""
+    if fmt == "ndjson":
+        return "".join(
+            json.dumps(dict(zip(columns, row)), default=_json_default) + "\n" for row in rows)
+    buffer = io.StringIO()
+    csv.writer(buffer, lineterminator="\n").writerows(
+        [value.isoformat() if isinstance(value, (datetime, date)) else value
+         for value in row] for row in rows)
+    return buffer.getvalue()
+
+
+def export_rows(db: Session, stmt, fmt: str, batch_size: int = EXPORT_BATCH_SIZE):
+    """Stream the rows of a select as NDJSON or CSV text, one batch at a time.
+
+    yield_per runs the query on a server-side cursor, so only ``batch_size`` rows are
+    held in memory whatever the size of the result.
+    """
+    get_media_type(fmt)
+    result = db.execute(stmt.execution_options(yield_per=batch_size))
+    columns = list(result.keys())
+    header = format_header(columns, fmt)
+    if header:
+        yield header
+    for rows in result.partitions():
+        yield format_rows(rows, columns, fmt)
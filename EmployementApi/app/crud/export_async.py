@@ -0,0 +1,15 @@
+"""Async streaming export of tasks and employees, used when USE_ASYNC_DB is enabled."""
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.crud.export import EXPORT_BATCH_SIZE, format_header, format_rows, get_media_type
+
+
+async def export_rows(db: AsyncSession, stmt, fmt: str, batch_size: int = EXPORT_BATCH_SIZE):
+    """Stream the rows of a select as NDJSON or CSV text, see crud.export.export_rows."""
+    get_media_type(fmt)
+    result = await db.stream(stmt.execution_options(yield_per=batch_size))
+    columns = list(result.keys())
+    header = format_header(columns, fmt)
+    if header:
+        yield header
+    async for rows in result.partitions():
+        yield format_rows(rows, columns, fmt)
@@ -0,0 +1,119 @@
+"""Crud operations for token revocation, the store behind the in-memory token denylist."""
+import asyncio
+import logging
+import os
+from datetime import datetime, timedelta
+from typing import Optional
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from app.core.jwt_handle import REFRESH_TOKEN_EXPIRE_DAYS
+from app.core.revocation import token_denylist
+from app.db.session import SessionLocal
+from app.models.revoked_token import RevokedToken
+from app.models.user import User
+
+# Seconds between two syncs of a worker's denylist with the revoked_tokens table
+REVOCATION_SYNC_SECONDS = float(os.getenv("REVOCATION_SYNC_SECONDS", "5"))
+# Every sync reads back this far past the previous one, for revocations committed late
+REVOCATION_SYNC_OVERLAP_SECONDS = 60
+
+logger = logging.getLogger(__name__)
+_last_sync = None
+
+
+def revoke_token(db: Session, payload: dict) -> bool:
+    """Revoke the token of a decoded payload until it expires, False when it has no jti."""
+    jti = payload.get("jti")
+    if jti is None or "exp" not in payload:
+        return False
+    expires_at = float(payload["exp"])
+    try:
+        db.execute(insert(RevokedToken).values(
+            jti=jti, user_id=payload.get("uid"),
+            expires_at=datetime.fromtimestamp(expires_at)))
+        db.commit()
+    except IntegrityError:
+        # Revoked already
+        db.rollback()
+    token_denylist.revoke_token(jti, expires_at)
+    return True
+
+
+def revoke_user_tokens(db: Session, user_id: int) -> int:
+    """Revoke every token issued to a user so far by bumping their token version."""
+    version = db.execute(
+        update(User).where(User.id == user_id)
+        .values(token_version=User.token_version + 1).returning(User.token_version),
+        execution_options={"synchronize_session": False}).scalar_one_or_none()
+    if version is None:
+        db.rollback()
+        raise ValueError("User not found.")
+    # Refresh tokens live the longest, the revocation must outlive all of them
+    expires_at = datetime.now() + timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS)
+    db.execute(insert(RevokedToken).values(
+        user_id=user_id, token_version=version, expires_at=expires_at))
+    db.commit()
+    token_denylist.revoke_user(user_id, version, expires_at.timestamp())
+    return version
+
+
+def load_revocations(db: Session, since: Optional[datetime] = None):
+    """Add the unexpired revocations recorded since a time, or all of them, to the denylist."""
+    stmt = select(RevokedToken.jti, RevokedToken.user_id, RevokedToken.token_version,
+                  RevokedToken.expires_at).where(RevokedToken.expires_at > datetime.now())
+    if since is not None:
+        stmt = stmt.where(RevokedToken.revoked_at >= since)
+    for row in db.execute(stmt):
+        expires_at = row.expires_at.timestamp()
+        if row.jti is not None:
+            token_denylist.revoke_token(row.jti, expires_at)
+        else:
+            token_denylist.revoke_user(row.user_id, row.token_version, expires_at)
+
+
+def purge_revocations(db: Session) -> int:
+    """Delete the revocations whose tokens have all expired, returning how many."""
+    deleted = db.execute(
+        delete(RevokedToken).where(RevokedToken.expires_at <= datetime.now())).rowcount
+    db.commit()
+    return deleted
+
+
+def sync_token_denylist(db: Session):
+    """Bring the denylist up to date with the revocations made by every worker.
+
+    The first sync purges expired rows and loads everything, later ones only the
+    rows revoked since the previous sync.
+    """
+    global _last_sync  # pylint: disable=global-statement
+    started = datetime.now()
+    if _last_sync is None:
+        purge_revocations(db)
+        load_revocations(db)
+    else:
+        load_revocations(db, _last_sync - timedelta(seconds=REVOCATION_SYNC_OVERLAP_SECONDS))
+    token_denylist.prune()
+    _last_sync = started
+
+
+def _sync_token_denylist():
+    """Sync the denylist on a session of its own."""
+    with SessionLocal() as db:
+        sync_token_denylist(db)
+
+
+async def refresh_token_denylist():
+    """Sync the denylist on a worker thread, keeping the event loop free."""
+    await asyncio.to_thread(_sync_token_denylist)
+
+
+async def keep_token_denylist_synced():
+    """Sync the denylist every REVOCATION_SYNC_SECONDS, for the lifetime of the app."""
+    while True:
+        await asyncio.sleep(REVOCATION_SYNC_SECONDS)
+        try:
+            await refresh_token_denylist()
+        except Exception:  # pylint: disable=broad-except
+            # A database outage must not stop the syncs that follow it
+            logger.exception("Token denylist sync failed")
@@ -1,83 +1,347 @@
 """Crud operations for Task model."""
+import os
+from datetime import datetime, timedelta
+from typing import Optional
+from sqlalchemy import false, insert, select, tuple_, update
 from sqlalchemy.orm import Session
+from app.core.events import task_hub
+from app.core.pagination import (decode_change_cursor, decode_cursor, encode_change_cursor,
+                                 encode_cursor)
 from app.models.task import Task
 from app.models.user import User
-from app.schemas.task import TaskCreate, TaskUpdate
+from app.schemas.task import BulkTaskResult, TaskCreate, TaskRow, TaskUpdate
 
+# Columns returned by the bulk statements, mapped to TaskUpdate by _row_to_task
+TASK_COLUMNS = (Task.id, Task.title, Task.description, Task.status, Task.priority,
+                Task.assigned_to, Task.due_date, Task.assigned_by, Task.is_deleted,
+                Task.modified_by)
+# Columns of the task list endpoints, in TaskRow field order
+TASK_LIST_COLUMNS = (Task.id, Task.title, Task.description, Task.status, Task.is_deleted,
+                     Task.modified_by, Task.assigned_to, User.full_name.label("assigned_to_name"),
+                     Task.priority, Task.due_date, Task.assigned_by)
+# The change feed only serves changes at least this old: modified_at is stamped before
+# commit, so a write still in flight could otherwise land behind a cursor already handed out
+CHANGE_FEED_SETTLE_SECONDS = float(os.getenv("CHANGE_FEED_SETTLE_SECONDS", "2"))
 
-def get_task(db: Session, task_id: int):
-    """Retrieve a task by its ID."""
-    db_task = db.query(Task).filter(Task.id == task_id).first()
+
+def parse_datetime(value):
+    """Parse ISO date strings, asyncpg does not coerce strings into timestamps."""
+    if isinstance(value, str):
+        return datetime.fromisoformat(value)
+    return value
+
+
+def _row_to_task(row) -> TaskUpdate:
+    """Map a row selected with TASK_COLUMNS to the task schema."""
     return TaskUpdate(
-        id=db_task.id,
-        title=db_task.title,
-        description=db_task.description,
-        status=db_task.status,
-        priority=db_task.priority,
-        assigned_to=db_task.assigned_to,
-        due_date=db_task.due_date,
-        assigned_by=db_task.assigned_by
+        id=row.id,
+        title=row.title,
+        description=row.description,
+        status=row.status,
+        priority=row.priority,
+        assigned_to=row.assigned_to,
+        due_date=row.due_date,
+        assigned_by=row.assigned_by,
+        is_deleted=row.is_deleted,
+        modified_by=row.modified_by
     )
 
 
-def get_tasks(db: Session, skip: int = 0, limit: int = 100):
-    """Retrieve a list of tasks with pagination."""
-    db_tasks = db.query(Task, User).join(
-        User, Task.assigned_to == User.id).offset(skip).limit(limit).all()
-    return [
-        TaskUpdate(
-            id=task.id,
-            title=task.title,
-            description=task.description,
-            status=task.status,
-            priority=task.priority,
-            assigned_to=task.assigned_to,
-            due_date=task.due_date,
-            assigned_by=task.assigned_by,
-            assigned_to_name=user.full_name if user else None,
-        )
-        for task, user in db_tasks
-    ]
+def build_task_query(task_id: int):
+    """Build the select of one task with its modified_at, the validator of HTTP caching."""
+    return select(*TASK_COLUMNS, Task.modified_at).where(Task.id == task_id)
+
+
+def to_task_version(row):
+    """Map a row of build_task_query to (task, modified_at), (None, None) without a row."""
+    if row is None:
+        return None, None
+    return _row_to_task(row), row.modified_at
+
+
+def publish_task_event(task: TaskUpdate, event: Optional[str] = None,
+                       previous_assignee: Optional[int] = None):
+    """Push a created or changed task to the live streams of its assignee.
+
+    A task reassigned away from ``previous_assignee`` is sent to them as "removed".
+    """
+    if event is None:
+        event = "deleted" if task.is_deleted else "updated"
+    task_hub.publish(task.assigned_to, event, task)
+    if previous_assignee is not None and previous_assignee != task.assigned_to:
+        task_hub.publish(previous_assignee, "removed", task)
+
+
+def get_task(db: Session, task_id: int):
+    """Retrieve a task by its ID, together with its modified_at."""
+    return to_task_version(db.execute(build_task_query(task_id)).one_or_none())
+
+
+def build_page_version_query(stmt):
+    """Build the select of the ids and latest changes of the rows of a page select.
+
+    The page keeps its joins, filters, order and limit, so the rows are exactly those the
+    page returns, with the assignees their names are read from. Only small columns are
+    read, the page body is never built.
+    """
+    return stmt.with_only_columns(Task.id, Task.modified_at.label("task_modified_at"),
+                                  User.modified_at.label("user_modified_at"))
+
+
+def to_page_version(rows):
+    """Map the rows of build_page_version_query to the page's (ordered ids, last modified).
+
+    The ids tell apart pages whose rows changed membership without any newer change, e.g.
+    a row leaving a filter while an older one enters the window.
+    """
+    changes = [value for row in rows for value in (row.task_modified_at, row.user_modified_at)
+               if value is not None]
+    return tuple(row.id for row in rows), max(changes, default=None)
+
+
+def build_tasks_query(skip: int = 0, limit: int = 100, cursor: Optional[str] = None):
+    """Build the select for a page of tasks ordered by ID, with the name of their assignee.
+
+    When a cursor is given the page starts right after the last task it points to
+    (keyset pagination) and ``skip`` is ignored; otherwise ``skip``/``limit`` are used.
+    """
+    stmt = select(*TASK_LIST_COLUMNS).join(
+        User, Task.assigned_to == User.id).order_by(Task.id)
+    if cursor:
+        stmt = stmt.where(Task.id > decode_cursor(cursor))
+    elif skip:
+        stmt = stmt.offset(skip)
+    # Fetch one extra row to know whether another page exists
+    return stmt.limit(limit + 1)
+
+
+def get_tasks(db: Session, skip: int = 0, limit: int = 100, cursor: Optional[str] = None):
+    """Retrieve a page of tasks, together with the cursor for the next page.
+
+    See build_tasks_query; the rows are read-only TaskRow objects.
+    """
+    return to_task_page(db.execute(build_tasks_query(skip, limit, cursor)).all(), limit)
+
+
+def get_tasks_version(db: Session, skip: int = 0, limit: int = 100,
+                      cursor: Optional[str] = None):
+    """Return the (ids, last modified) of the page get_tasks would return, for its ETag."""
+    stmt = build_page_version_query(build_tasks_query(skip, limit, cursor))
+    return to_page_version(db.execute(stmt).all())
+
+
+def to_task_page(rows, limit: int):
+    """Map rows selected with TASK_LIST_COLUMNS and limit + 1 to a page and its next cursor.
+
+    Plain columns never enter the session identity map, and TaskRow skips validation.
+    """
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1].id) if rows else None
+    return [TaskRow(*row) for row in rows], next_cursor
+
+
+def apply_task_filters(stmt, assigned_to: Optional[int] = None,
+                       assigned_by: Optional[int] = None,
+                       status: Optional[str] = None,
+                       priority: Optional[str] = None,
+                       due_from: Optional[datetime] = None,
+                       due_to: Optional[datetime] = None,
+                       include_deleted: bool = False):
+    """Add the task filters to a select, shared by the filtered pages and the export."""
+    if not include_deleted:
+        # Written as "= false" so the partial indexes on live tasks apply
+        stmt = stmt.where(Task.is_deleted == false())
+    if assigned_to is not None:
+        stmt = stmt.where(Task.assigned_to == assigned_to)
+    if assigned_by is not None:
+        stmt = stmt.where(Task.assigned_by == assigned_by)
+    if status is not None:
+        stmt = stmt.where(Task.status == status)
+    if priority is not None:
+        stmt = stmt.where(Task.priority == priority)
+    if due_from is not None:
+        stmt = stmt.where(Task.due_date >= due_from)
+    if due_to is not None:
+        stmt = stmt.where(Task.due_date < due_to)
+    return stmt
+
+
+def build_filtered_tasks_query(limit: int = 100, cursor: Optional[str] = None, **filters):
+    """Build the select for a filtered, keyset-paginated page of tasks and their assignee name.
+
+    Accepts the filters of apply_task_filters.
+    """
+    stmt = apply_task_filters(select(*TASK_LIST_COLUMNS).outerjoin(
+        User, Task.assigned_to == User.id).order_by(Task.id), **filters)
+    if cursor:
+        stmt = stmt.where(Task.id > decode_cursor(cursor))
+    # Fetch one extra row to know whether another page exists
+    return stmt.limit(limit + 1)
+
+
+def filter_tasks(db: Session, limit: int = 100, **filters):
+    """Retrieve a page of tasks matching the filters, together with the cursor for the next page.
+
+    Accepts the filters of apply_task_filters, all applied in SQL.
+    """
+    stmt = build_filtered_tasks_query(limit=limit, **filters)
+    return to_task_page(db.execute(stmt).all(), limit)
+
+
+def filter_tasks_version(db: Session, limit: int = 100, **filters):
+    """Return the (ids, last modified) of the page filter_tasks would return, for its ETag."""
+    stmt = build_page_version_query(build_filtered_tasks_query(limit=limit, **filters))
+    return to_page_version(db.execute(stmt).all())
+
+
+def build_changes_query(limit: int = 100, since: Optional[str] = None):
+    """Build the select of the tasks created, updated or soft deleted after a change cursor.
+
+    Changes are read in (modified_at, id) order off ix_tasks_modified_at_id, deleted
+    tasks included; without a cursor the feed starts from the oldest task.
+    """
+    settled = datetime.now() - timedelta(seconds=CHANGE_FEED_SETTLE_SECONDS)
+    stmt = select(*TASK_LIST_COLUMNS, Task.modified_at).outerjoin(
+        User, Task.assigned_to == User.id).where(Task.modified_at <= settled).order_by(
+        Task.modified_at, Task.id)
+    if since:
+        modified_at, last_id = decode_change_cursor(since)
+        stmt = stmt.where(tuple_(Task.modified_at, Task.id) > tuple_(modified_at, last_id))
+    # Fetch one extra row to know whether more changes are waiting
+    return stmt.limit(limit + 1)
+
+
+def to_change_page(rows, limit: int, since: Optional[str] = None):
+    """Map rows of build_changes_query to (changed tasks, next cursor, has more).
+
+    The next cursor points after the last change returned, or stays ``since`` when
+    nothing changed, so clients can always store it for their next poll.
+    """
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    next_cursor = encode_change_cursor(rows[-1].modified_at, rows[-1].id) if rows else since
+    return [TaskRow(*row[:-1]) for row in rows], next_cursor, has_more
+
+
+def get_task_changes(db: Session, limit: int = 100, since: Optional[str] = None):
+    """Retrieve the tasks changed after a change cursor, see build_changes_query."""
+    return to_change_page(db.execute(build_changes_query(limit, since)).all(), limit, since)
 
 
 def create_task(db: Session, task: TaskCreate):
-    """Create a new task."""
-    db_task = Task(**task.model_dump())
-    db.add(db_task)
+    """Create a new task, reading server defaults back with RETURNING in the same statement."""
+    values = task.model_dump()
+    values["due_date"] = parse_datetime(values["due_date"])
+    row = db.execute(insert(Task).values(**values).returning(*TASK_COLUMNS)).one()
     db.commit()
-    db.refresh(db_task)
-    created_task = TaskUpdate(
-        id=db_task.id,
-        title=db_task.title,
-        description=db_task.description,
-        status=db_task.status,
-        priority=db_task.priority,
-        assigned_to=db_task.assigned_to,
-        due_date=db_task.due_date,
-        assigned_by=db_task.assigned_by
-    )
-    return created_task
+    created = _row_to_task(row)
+    publish_task_event(created, "created")
+    return created
 
 
 def update_task(db: Session, task_id: int, task: TaskUpdate, updated_by: int):
-    """Update an existing task."""
-    db_task = db.query(Task).filter(Task.id == task_id).first()
-    db_task.modified_by = updated_by
-    if not db_task:
+    """Update an existing task with a single UPDATE ... RETURNING, None if it does not exist."""
+    values = task.model_dump(exclude_unset=True, exclude={"id", "assigned_to_name"})
+    values["modified_by"] = updated_by
+    previous_assignee = None
+    if "assigned_to" in values:
+        # Locked until the commit, so the previous assignee is the one this update replaces
+        previous_assignee = db.scalar(
+            select(Task.assigned_to).where(Task.id == task_id).with_for_update())
+    row = db.execute(
+        update(Task).where(Task.id == task_id).values(**values).returning(*TASK_COLUMNS),
+        execution_options={"synchronize_session": False}).one_or_none()
+    if row is None:
+        db.rollback()
         return None
-    for key, value in task.model_dump(exclude_unset=True).items():
-        setattr(db_task, key, value)
     db.commit()
-    db.refresh(db_task)
-    return TaskUpdate(
-        id=db_task.id,
-        title=db_task.title,
-        description=db_task.description,
-        status=db_task.status,
-        priority=db_task.priority,
-        assigned_to=db_task.assigned_to,
-        due_date=db_task.due_date,
-        assigned_by=db_task.assigned_by,
-        is_deleted=db_task.is_deleted,
-        modified_by=db_task.modified_by
-    )
+    updated = _row_to_task(row)
+    publish_task_event(updated, previous_assignee=previous_assignee)
+    return updated
+
+
+def bulk_create_tasks(db: Session, tasks: list[TaskCreate], assigned_by: int):
+    """Create many tasks in one transaction with a batched INSERT ... RETURNING.
+
+    Tasks assigned to an unknown user are reported as failed and skipped, the others
+    are inserted together.
+    """
+    assignee_ids = {task.assigned_to for task in tasks if task.assigned_to is not None}
+    known_ids = set(db.scalars(select(User.id).where(User.id.in_(assignee_ids)))) \
+        if assignee_ids else set()
+    results = [None] * len(tasks)
+    rows, positions = [], []
+    for index, task in enumerate(tasks):
+        if task.assigned_to is not None and task.assigned_to not in known_ids:
+            results[index] = BulkTaskResult(
+                index=index, success=False, error="Assigned user not found")
+            continue
+        values = task.model_dump()
+        values["due_date"] = parse_datetime(values["due_date"])
+        values["assigned_by"] = assigned_by
+        rows.append(values)
+        positions.append(index)
+    if rows:
+        created = db.execute(
+            insert(Task).returning(*TASK_COLUMNS, sort_by_parameter_order=True), rows).all()
+        db.commit()
+        for index, row in zip(positions, created):
+            results[index] = BulkTaskResult(
+                index=index, success=True, id=row.id, task=_row_to_task(row))
+            publish_task_event(results[index].task, "created")
+    return results
+
+
+def bulk_update_tasks(db: Session, tasks: list[TaskUpdate], updated_by: int):
+    """Apply many partial task updates in one transaction with executemany UPDATEs."""
+    # Current assignees, locked until the commit, to notify those a task is taken from
+    previous_assignees = dict(db.execute(
+        select(Task.id, Task.assigned_to).where(Task.id.in_({task.id for task in tasks}))
+        .with_for_update()).all())
+    results = [None] * len(tasks)
+    params, positions = [], []
+    for index, task in enumerate(tasks):
+        if task.id not in previous_assignees:
+            results[index] = BulkTaskResult(
+                index=index, success=False, id=task.id, error="Task not found")
+            continue
+        values = task.model_dump(exclude_unset=True, exclude={"assigned_to_name"})
+        values["modified_by"] = updated_by
+        values["modified_at"] = datetime.now()
+        params.append(values)
+        positions.append(index)
+    if params:
+        # ORM bulk UPDATE by primary key, rows with the same columns share one executemany
+        db.execute(update(Task), params)
+        db.commit()
+        updated = {row.id: row for row in db.execute(
+            select(*TASK_COLUMNS).where(Task.id.in_({values["id"] for values in params})))}
+        for index in positions:
+            row = updated[tasks[index].id]
+            results[index] = BulkTaskResult(
+                index=index, success=True, id=row.id, task=_row_to_task(row))
+            publish_task_event(results[index].task,
+                               previous_assignee=previous_assignees[row.id])
+    return results
+
+
+def bulk_delete_tasks(db: Session, task_ids: list[int], updated_by: int):
+    """Soft delete many tasks with a single UPDATE ... RETURNING."""
+    deleted = {row.id: row for row in db.execute(
+        update(Task).where(Task.id.in_(set(task_ids)))
+        .values(is_deleted=True, modified_by=updated_by, modified_at=datetime.now())
+        .returning(*TASK_COLUMNS),
+        execution_options={"synchronize_session": False})}
+    db.commit()
+    results = [
+        BulkTaskResult(index=index, success=True, id=task_id, task=_row_to_task(deleted[task_id]))
+        if task_id in deleted else
+        BulkTaskResult(index=index, success=False, id=task_id, error="Task not found")
+        for index, task_id in enumerate(task_ids)
+    ]
+    for result in results:
+        if result.success:
+            publish_task_event(result.task, "deleted")
+    return results
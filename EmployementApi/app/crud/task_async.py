@@ -0,0 +1,70 @@
+"""Async CRUD operations for Task model, used when USE_ASYNC_DB is enabled."""
+from typing import Optional
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.crud import task as crud_task
+from app.crud.task import (build_changes_query, build_filtered_tasks_query,
+                           build_page_version_query, build_task_query, build_tasks_query,
+                           to_change_page, to_page_version, to_task_page, to_task_version)
+from app.schemas.task import TaskCreate, TaskUpdate
+
+
+async def get_task(db: AsyncSession, task_id: int):
+    """Retrieve a task by its ID, together with its modified_at."""
+    return to_task_version((await db.execute(build_task_query(task_id))).one_or_none())
+
+
+async def get_tasks(db: AsyncSession, skip: int = 0, limit: int = 100,
+                    cursor: Optional[str] = None):
+    """Retrieve a page of tasks, together with the cursor for the next page."""
+    stmt = build_tasks_query(skip, limit, cursor)
+    return to_task_page((await db.execute(stmt)).all(), limit)
+
+
+async def get_tasks_version(db: AsyncSession, skip: int = 0, limit: int = 100,
+                            cursor: Optional[str] = None):
+    """Return the (ids, last modified) of a page of tasks, see crud.task.get_tasks_version."""
+    stmt = build_page_version_query(build_tasks_query(skip, limit, cursor))
+    return to_page_version((await db.execute(stmt)).all())
+
+
+async def filter_tasks(db: AsyncSession, limit: int = 100, **filters):
+    """Retrieve a page of tasks matching the filters, see crud.task.filter_tasks."""
+    stmt = build_filtered_tasks_query(limit=limit, **filters)
+    return to_task_page((await db.execute(stmt)).all(), limit)
+
+
+async def filter_tasks_version(db: AsyncSession, limit: int = 100, **filters):
+    """Return the (ids, last modified) of a filtered page, see crud.task.filter_tasks_version."""
+    stmt = build_page_version_query(build_filtered_tasks_query(limit=limit, **filters))
+    return to_page_version((await db.execute(stmt)).all())
+
+
+async def get_task_changes(db: AsyncSession, limit: int = 100, since: Optional[str] = None):
+    """Retrieve the tasks changed after a change cursor, see crud.task.get_task_changes."""
+    stmt = build_changes_query(limit, since)
+    return to_change_page((await db.execute(stmt)).all(), limit, since)
+
+
+async def create_task(db: AsyncSession, task: TaskCreate):
+    """Create a new task in one round trip, see crud.task.create_task."""
+    return await db.run_sync(crud_task.create_task, task)
+
+
+async def update_task(db: AsyncSession, task_id: int, task: TaskUpdate, updated_by: int):
+    """Update an existing task in one round trip, see crud.task.update_task."""
+    return await db.run_sync(crud_task.update_task, task_id, task, updated_by)
+
+
+async def bulk_create_tasks(db: AsyncSession, tasks: list[TaskCreate], assigned_by: int):
+    """Create many tasks in one transaction, see crud.task.bulk_create_tasks."""
+    return await db.run_sync(crud_task.bulk_create_tasks, tasks, assigned_by)
+
+
+async def bulk_update_tasks(db: AsyncSession, tasks: list[TaskUpdate], updated_by: int):
+    """Apply many partial task updates in one transaction, see crud.task.bulk_update_tasks."""
+    return await db.run_sync(crud_task.bulk_update_tasks, tasks, updated_by)
+
+
+async def bulk_delete_tasks(db: AsyncSession, task_ids: list[int], updated_by: int):
+    """Soft delete many tasks with a single statement, see crud.task.bulk_delete_tasks."""
+    return await db.run_sync(crud_task.bulk_delete_tasks, task_ids, updated_by)
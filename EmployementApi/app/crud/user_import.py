@@ -0,0 +1,210 @@
+"""Bulk employee import from CSV or JSON Lines in the Employment API."""
+import asyncio
+import csv
+import json
+from sqlalchemy import insert, or_, select
+from sqlalchemy.orm import Session
+from pydantic import ValidationError
+from app.core.security import hash_passwords
+from app.crud.auth import allocate_employee_ids, invalidate_user
+from app.crud.employee_search import employee_index
+from app.crud.task import parse_datetime
+from app.models.enums import get_user_role_number
+from app.models.user import User
+from app.schemas.user import UserCreate, UserImportError, UserImportReport
+
+IMPORT_FORMATS = ("csv", "jsonl")
+# Rows validated, hashed and inserted together
+IMPORT_CHUNK_SIZE = 1000
+
+
+class UserRecordReader:
+    """Turn the lines of a CSV (with a header row) or JSONL file into user records."""
+
+    def __init__(self, fmt: str):
+        if fmt not in IMPORT_FORMATS:
+            raise ValueError(f"Unsupported import format '{fmt}', use csv or jsonl.")
+        self.fmt = fmt
+        self.header = None
+        self.line_no = 0
+
+    def feed(self, line: str):
+        """Parse one line, returning (line number, record or error) or None for headers/blanks.
+
+        CSV values must not contain line breaks, lines are parsed one at a time.
+        """
+        self.line_no += 1
+        line = line.rstrip("\r\n")
+        if not line.strip():
+            return None
+        try:
+            if self.fmt == "jsonl":
+                record = json.loads(line)
+                if not isinstance(record, dict):
+                    raise ValueError("Expected a JSON object.")
+                return self.line_no, record
+            values = next(csv.reader([line]))
+            if self.header is None:
+                self.header = [name.strip() for name in values]
+                return None
+            if len(values) != len(self.header):
+                raise ValueError(
+                    f"Expected {len(self.header)} columns, got {len(values)}.")
+            return self.line_no, dict(zip(self.header, values))
+        except (ValueError, csv.Error) as e:
+            return self.line_no, e
+
+
+def _validate(record) -> UserCreate:
+    """Validate a parsed record against the registration schema."""
+    if isinstance(record, Exception):
+        raise record
+    user_in = UserCreate(**record)
+    parse_datetime(user_in.date_of_birth)  # Reject bad dates before hashing
+    return user_in
+
+
+def validate_user_chunk(rows, report: UserImportReport, seen: set) -> list:
+    """Validate one chunk of (line number, record) rows, returning the (line, user) to add.
+
+    ``seen`` holds the emails and usernames already taken by earlier rows of the same
+    import, rejected rows are added to the report.
+    """
+    valid = []
+    for line, record in rows:
+        report.total += 1
+        try:
+            user_in = _validate(record)
+        except (ValidationError, ValueError, TypeError) as e:
+            email = record.get("email") if isinstance(record, dict) else None
+            report.errors.append(UserImportError(line=line, email=email, error=str(e)))
+            continue
+        if user_in.email in seen or user_in.username in seen:
+            report.errors.append(UserImportError(
+                line=line, email=user_in.email, error="Duplicate email or username in file."))
+            continue
+        seen.update((user_in.email, user_in.username))
+        valid.append((line, user_in))
+    return valid
+
+
+def hash_user_chunk(valid: list) -> list:
+    """Hash the passwords of validated rows, returning (line, user, password hash)."""
+    hashes = hash_passwords([user_in.password for _, user_in in valid]) if valid else []
+    return [(line, user_in, password_hash)
+            for (line, user_in), password_hash in zip(valid, hashes)]
+
+
+async def hash_user_chunk_async(valid: list) -> list:
+    """Async variant of hash_user_chunk, waiting for the hashing pool on a worker thread."""
+    return await asyncio.to_thread(hash_user_chunk, valid)
+
+
+def insert_user_chunk(db: Session, hashed: list, report: UserImportReport) -> UserImportReport:
+    """Insert hashed rows that do not clash with existing users, in one batched INSERT.
+
+    Existing users are found with one query for the whole chunk. No hashing happens here,
+    so the async stack can run it through AsyncSession.run_sync.
+    """
+    if hashed:
+        taken = set()
+        for email, username in db.execute(select(User.email, User.username).where(or_(
+                User.email.in_([user_in.email for _, user_in, _ in hashed]),
+                User.username.in_([user_in.username for _, user_in, _ in hashed])))):
+            taken.update((email, username))
+        new_rows = []
+        for line, user_in, password_hash in hashed:
+            if user_in.email in taken or user_in.username in taken:
+                report.errors.append(UserImportError(
+                    line=line, email=user_in.email, error="User already exists."))
+            else:
+                new_rows.append((line, user_in, password_hash))
+        hashed = new_rows
+
+    if hashed:
+        new_users = [{
+            "email": user_in.email,
+            "username": user_in.username,
+            "password_hash": password_hash,
+            "date_of_birth": parse_datetime(user_in.date_of_birth),
+            "full_name": user_in.employee_name,
+            "phone_number": user_in.phone_number,
+            "user_role": get_user_role_number(user_in.role),
+        } for _, user_in, password_hash in hashed]
+        try:
+            employee_ids = allocate_employee_ids(db, len(new_users))
+            if employee_ids is not None:
+                for new_user, employee_id in zip(new_users, employee_ids):
+                    new_user["employee_id"] = employee_id
+            db.execute(insert(User), new_users)
+            db.commit()
+        except Exception as e:  # pylint: disable=broad-except
+            # e.g. a concurrent registration took one of the emails, fail the chunk only
+            db.rollback()
+            report.errors.extend(UserImportError(
+                line=line, email=user_in.email, error=f"Insert failed: {str(e)}")
+                for line, user_in, _ in hashed)
+        else:
+            report.imported += len(hashed)
+            for _, user_in, _ in hashed:
+                invalidate_user(email=user_in.email)
+            employee_index.invalidate()
+    report.failed = len(report.errors)
+    return report
+
+
+def import_user_chunk(db: Session, rows, report: UserImportReport, seen: set):
+    """Validate, hash and insert one chunk of (line number, record) rows."""
+    hashed = hash_user_chunk(validate_user_chunk(rows, report, seen))
+    return insert_user_chunk(db, hashed, report)
+
+
+def import_users(db: Session, lines, fmt: str, chunk_size: int = IMPORT_CHUNK_SIZE):
+    """Stream an iterable of CSV/JSONL lines into the users table, chunk by chunk."""
+    reader = UserRecordReader(fmt)
+    report = UserImportReport()
+    seen = set()
+    chunk = []
+    for line in lines:
+        parsed = reader.feed(line)
+        if parsed is None:
+            continue
+        chunk.append(parsed)
+        if len(chunk) >= chunk_size:
+            import_user_chunk(db, chunk, report, seen)
+            chunk = []
+    if chunk:
+        import_user_chunk(db, chunk, report, seen)
+    return report
+
+
+async def import_users_stream(byte_chunks, fmt: str, run_chunk,
+                              chunk_size: int = IMPORT_CHUNK_SIZE):
+    """Import users from an async stream of bytes, such as a request body.
+
+    ``run_chunk(rows, report, seen)`` is awaited for every chunk and imports it off the
+    event loop: import_user_chunk in the threadpool, or hash_user_chunk_async followed by
+    insert_user_chunk through AsyncSession.run_sync.
+    """
+    reader = UserRecordReader(fmt)
+    report = UserImportReport()
+    seen = set()
+    chunk = []
+    buffer = b""
+    async for data in byte_chunks:
+        buffer += data
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            parsed = reader.feed(line.decode("utf-8-sig" if reader.line_no == 0 else "utf-8"))
+            if parsed is not None:
+                chunk.append(parsed)
+        if len(chunk) >= chunk_size:
+            await run_chunk(chunk, report, seen)
+            chunk = []
+    if buffer:
+        parsed = reader.feed(buffer.decode("utf-8"))
+        if parsed is not None:
+            chunk.append(parsed)
+    if chunk:
+        await run_chunk(chunk, report, seen)
+    return report
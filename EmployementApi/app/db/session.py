@@ -1,14 +1,129 @@
 """This is the database session management module for the Employment API."""
 import os
+import threading
+import time
 from sqlalchemy import create_engine
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
 from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
 from dotenv import load_dotenv
 
 load_dotenv()  # Load .env file
 
 DATABASE_URL = os.getenv("DATABASE_URL")
+# Serve requests through the async engine and async CRUD layer instead of SessionLocal
+USE_ASYNC_DB = os.getenv("USE_ASYNC_DB", "false").lower() == "true"
 
-engine = create_engine(DATABASE_URL)
+# Connection pool settings, tune these to the database/proxy connection limits
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+# Recycle connections before the proxy drops them as idle (seconds, -1 disables)
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+
+
+class PoolStatsMixin:
+    """Pool mixin recording how long successful checkouts wait and how often they time out."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._stats_lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def connect(self):
+        """Check out a connection, timing how long the caller waited for it."""
+        start = time.perf_counter()
+        try:
+            connection = super().connect()
+        except PoolTimeoutError:
+            with self._stats_lock:
+                self.timeouts += 1
+            raise
+        waited = time.perf_counter() - start
+        with self._stats_lock:
+            self.checkouts += 1
+            self.total_wait += waited
+            self.max_wait = max(self.max_wait, waited)
+        return connection
+
+    def stats(self) -> dict:
+        """Return the current pool occupancy and checkout wait statistics."""
+        with self._stats_lock:
+            checkouts = self.checkouts
+            return {
+                "pool_size": self.size(),
+                "checked_in": self.checkedin(),
+                "checked_out": self.checkedout(),
+                # QueuePool counts from -pool_size, report only connections beyond the pool
+                "overflow": max(self.overflow(), 0),
+                "max_overflow": self._max_overflow,
+                "timeout": self._timeout,
+                "checkouts": checkouts,
+                "timeouts": self.timeouts,
+                "avg_wait_ms": (self.total_wait / checkouts * 1000) if checkouts else 0.0,
+                "max_wait_ms": self.max_wait * 1000,
+            }
+
+
+class InstrumentedQueuePool(PoolStatsMixin, QueuePool):
+    """QueuePool of the sync engine, with checkout statistics."""
+
+
+class InstrumentedAsyncQueuePool(PoolStatsMixin, AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool of the async engine, with checkout statistics."""
+
+
+engine = create_engine(
+    DATABASE_URL,
+    poolclass=InstrumentedQueuePool,
+    pool_size=DB_POOL_SIZE,
+    max_overflow=DB_MAX_OVERFLOW,
+    pool_timeout=DB_POOL_TIMEOUT,
+    pool_recycle=DB_POOL_RECYCLE,
+    pool_pre_ping=DB_POOL_PRE_PING,
+)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 Base = declarative_base()
+
+
+def get_async_database_url(url: str) -> str:
+    """Translate a sync Postgres URL into the asyncpg one used by the async engine."""
+    scheme, sep, rest = url.partition("://")
+    if scheme in ("postgres", "postgresql") or scheme.startswith("postgresql+"):
+        return f"postgresql+asyncpg{sep}{rest}"
+    return url
+
+
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL") or (
+    get_async_database_url(DATABASE_URL) if DATABASE_URL else None)
+
+# Only built when enabled, so the sync stack does not need an async driver installed
+async_engine = None
+AsyncSessionLocal = None
+if USE_ASYNC_DB:
+    # pylint: disable=ungrouped-imports
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+    async_engine = create_async_engine(
+        ASYNC_DATABASE_URL,
+        poolclass=InstrumentedAsyncQueuePool,
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_timeout=DB_POOL_TIMEOUT,
+        pool_recycle=DB_POOL_RECYCLE,
+        pool_pre_ping=DB_POOL_PRE_PING,
+    )
+    AsyncSessionLocal = async_sessionmaker(
+        async_engine, autoflush=False, expire_on_commit=False)
+
+
+def get_pool_stats() -> dict:
+    """Return the connection pool statistics of the sync engine, and of the async one."""
+    stats = engine.pool.stats()
+    if async_engine is not None:
+        stats["async"] = async_engine.pool.stats()
+    return stats
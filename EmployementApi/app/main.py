@@ -1,9 +1,29 @@
 """Main application entry point for FastAPI server."""
+import asyncio
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from app.api.routes import auth, items, tasks
+from app.api.routes import auth, internal, items, tasks, well_known
+from app.core.events import task_hub
+from app.core.security import shutdown_password_pool
+from app.crud import revocation as crud_revocation
+from app.db.session import USE_ASYNC_DB, async_engine
 
-app = FastAPI()
+
+@asynccontextmanager
+async def lifespan(_app: FastAPI):
+    """Load the token denylist on startup, release background resources when the server stops."""
+    await crud_revocation.refresh_token_denylist()
+    denylist_sync = asyncio.create_task(crud_revocation.keep_token_denylist_synced())
+    yield
+    denylist_sync.cancel()
+    task_hub.close()
+    shutdown_password_pool()
+    if async_engine is not None:
+        await async_engine.dispose()
+
+
+app = FastAPI(lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -14,7 +34,15 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Register routers
-app.include_router(auth.router, prefix="/auth")
+# Register routers, the async stack replaces the sync auth/task routes when enabled
+if USE_ASYNC_DB:
+    # Imported lazily, the async stack needs asyncpg and greenlet installed
+    from app.api.routes import auth_async, tasks_async  # pylint: disable=ungrouped-imports
+    app.include_router(auth_async.router, prefix="/auth")
+    app.include_router(tasks_async.router, prefix="/tasks")
+else:
+    app.include_router(auth.router, prefix="/auth")
+    app.include_router(tasks.router, prefix="/tasks")
 app.include_router(items.router, prefix="/api")
-app.include_router(tasks.router, prefix="/tasks")
+app.include_router(internal.router, prefix="/internal")
+app.include_router(well_known.router, prefix="/.well-known")
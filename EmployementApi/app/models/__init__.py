@@ -1,2 +1,3 @@
 from .user import User
 from .task import Task
+from .revoked_token import RevokedToken
@@ -0,0 +1,21 @@
+"""Revoked token model for the Employment API."""
+# pylint: disable=too-few-public-methods
+from datetime import datetime
+from sqlalchemy import Column, DateTime, ForeignKey, Integer, String
+from app.db.session import Base
+
+
+class RevokedToken(Base):
+    """A revoked token (jti), or every token of a user below a token version."""
+    __tablename__ = "revoked_tokens"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    # Id of the single revoked token, None when the row revokes a token version
+    jti = Column(String, nullable=True, unique=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=True)
+    # Tokens of user_id carrying a lower version are revoked
+    token_version = Column(Integer, nullable=True)
+    # Every token the row covers has expired by then, so it can be purged
+    expires_at = Column(DateTime, nullable=False, index=True)
+    # Workers load the rows revoked since their last sync
+    revoked_at = Column(DateTime, default=datetime.now, nullable=False, index=True)
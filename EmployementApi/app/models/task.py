@@ -1,13 +1,26 @@
 """Task model for the Employment API."""
 # pylint: disable=too-few-public-methods
 from datetime import datetime
-from sqlalchemy import Boolean, Column, DateTime, ForeignKey, Integer, String
+from sqlalchemy import Boolean, Column, DateTime, ForeignKey, Index, Integer, String, false, text
 from app.db.session import Base
 
 
 class Task(Base):
     """Task model for the Employment API."""
     __tablename__ = "tasks"
+    __table_args__ = (
+        # Assignee dashboards: tasks of a user, filtered by deletion flag and status
+        Index("ix_tasks_assigned_to_is_deleted_status",
+              "assigned_to", "is_deleted", "status"),
+        # Tasks handed out by an employer
+        Index("ix_tasks_assigned_by_is_deleted", "assigned_by", "is_deleted"),
+        # Keyset pages and due date ranges over live tasks only
+        Index("ix_tasks_active_id", "id", postgresql_where=text("is_deleted = false")),
+        Index("ix_tasks_active_due_date", "due_date",
+              postgresql_where=text("is_deleted = false")),
+        # Change feed: everything modified after a point in time
+        Index("ix_tasks_modified_at_id", "modified_at", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
     title = Column(String, nullable=False)
@@ -27,5 +40,5 @@ class Task(Base):
     due_date = Column(DateTime, nullable=True)
     # e.g., "low", "normal", "high"
     priority = Column(String, default="normal")
-    is_deleted = Column(Boolean, default=False)
+    is_deleted = Column(Boolean, default=False, server_default=false())
     modified_by = Column(Integer, ForeignKey("users.id"), nullable=True)
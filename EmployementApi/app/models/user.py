@@ -1,13 +1,24 @@
 """This is the User model for the Employment API."""
 # pylint: disable=too-few-public-methods
 from datetime import datetime
-from sqlalchemy import Column, DateTime, Integer, String
+from sqlalchemy import DDL, Column, DateTime, Index, Integer, Sequence, String, event, func
 from app.db.session import Base
 
+# First employee id handed out
+EMPLOYEE_ID_START = 10000
+# Employee ids are drawn from a sequence, so concurrent registrations never collide. Only
+# Postgres has one, on other databases crud.auth.allocate_employee_ids assigns the ids
+employee_id_seq = Sequence("users_employee_id_seq", start=EMPLOYEE_ID_START,
+                           metadata=Base.metadata)
+
 
 class User(Base):
     """User model for the Employment API."""
     __tablename__ = "users"
+    __table_args__ = (
+        # Employee listing: keyset pages of one role ordered by id
+        Index("ix_users_user_role_id", "user_role", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
     username = Column(String, unique=True, index=True)
@@ -17,11 +28,37 @@ class User(Base):
     date_of_birth = Column(DateTime)  # Nullable for non-employees
     phone_number = Column(String, nullable=True)  # Nullable for non-employees
     # Nullable for non-employees
-    employee_id = Column(Integer, unique=True, index=True, nullable=False)
+    employee_id = Column(Integer, employee_id_seq, unique=True, index=True, nullable=False)
     is_active = Column(Integer, default=1)  # 1 for active, 0 for inactive
     user_role = Column(Integer)  # e.g., "1=admin", "2=employer", "3=employee
+    # Carried by every token as "ver"; bumping it revokes all tokens issued before
+    token_version = Column(Integer, nullable=False, default=0, server_default="0")
     # Timestamp for creation
     created_at = Column(DateTime, default=datetime.now)
     # Timestamp for last modification
     modified_at = Column(DateTime, default=datetime.now,
                          onupdate=datetime.now)
+
+
+# Case-insensitive prefix search on name and email. Under the "C" collation LIKE 'abc%'
+# can use the index, and it hands back the matches already in name order. Postgres only,
+# other databases have no "C" collation and search through the in-memory trie
+Index("ix_users_lower_full_name_c", func.lower(User.full_name).collate("C"),
+      User.id).ddl_if(dialect="postgresql")
+Index("ix_users_lower_email_c", func.lower(User.email).collate("C"),
+      User.id).ddl_if(dialect="postgresql")
+# Typeahead substring search ranked by word similarity, GiST trigram indexes from pg_trgm
+# serve both the LIKE '%abc%' filter and the nearest-first ordering. Postgres only too
+Index("ix_users_lower_full_name_trgm", func.lower(User.full_name).label("lower_full_name"),
+      postgresql_using="gist",
+      postgresql_ops={"lower_full_name": "gist_trgm_ops"}).ddl_if(dialect="postgresql")
+Index("ix_users_lower_email_trgm", func.lower(User.email).label("lower_email"),
+      postgresql_using="gist",
+      postgresql_ops={"lower_email": "gist_trgm_ops"}).ddl_if(dialect="postgresql")
+event.listen(User.__table__, "before_create",
+             DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(dialect="postgresql"))
+# Server default of employee_id on Postgres, as set by migration 9a41f0c7d2e6, so inserts
+# outside SQLAlchemy draw from the sequence too
+event.listen(User.__table__, "after_create",
+             DDL("ALTER TABLE users ALTER COLUMN employee_id "
+                 "SET DEFAULT nextval('users_employee_id_seq')").execute_if(dialect="postgresql"))
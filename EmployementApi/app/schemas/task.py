@@ -1,6 +1,11 @@
 """Task schemas for the application."""
-from typing import Optional
-from pydantic import BaseModel
+from dataclasses import dataclass
+from datetime import datetime
+from typing import List, Optional
+from pydantic import BaseModel, Field
+
+# Largest number of tasks accepted by one bulk request
+BULK_MAX_TASKS = 1000
 
 
 class TaskBase(BaseModel):
@@ -28,6 +33,28 @@ class TaskUpdate(BaseModel):
     modified_by: Optional[int] = None
     assigned_to: Optional[int] = None
     assigned_to_name: Optional[str] = None
+    priority: Optional[str] = None
+    due_date: Optional[datetime] = None
+    assigned_by: Optional[int] = None
+
+
+@dataclass(slots=True)
+class TaskRow:
+    """Read-only task of the list endpoints, built straight from a selected row.
+
+    Same fields and order as TaskUpdate but without validation, rendered by orjson.
+    """
+    id: int
+    title: Optional[str] = None
+    description: Optional[str] = None
+    status: Optional[str] = None
+    is_deleted: Optional[bool] = None
+    modified_by: Optional[int] = None
+    assigned_to: Optional[int] = None
+    assigned_to_name: Optional[str] = None
+    priority: Optional[str] = None
+    due_date: Optional[datetime] = None
+    assigned_by: Optional[int] = None
 
 
 class Task(TaskBase):
@@ -37,3 +64,27 @@ class Task(TaskBase):
     class Config:
         """Configuration for Task schema."""
         from_attributes = True
+
+
+class TaskBulkCreate(BaseModel):
+    """Schema for creating many tasks in one request."""
+    tasks: List[TaskCreate] = Field(min_length=1, max_length=BULK_MAX_TASKS)
+
+
+class TaskBulkUpdate(BaseModel):
+    """Schema for updating many tasks in one request."""
+    tasks: List[TaskUpdate] = Field(min_length=1, max_length=BULK_MAX_TASKS)
+
+
+class TaskBulkDelete(BaseModel):
+    """Schema for deleting many tasks in one request."""
+    ids: List[int] = Field(min_length=1, max_length=BULK_MAX_TASKS)
+
+
+class BulkTaskResult(BaseModel):
+    """Outcome of one item of a bulk request, index is its position in the request."""
+    index: int
+    success: bool
+    id: Optional[int] = None
+    error: Optional[str] = None
+    task: Optional[TaskUpdate] = None
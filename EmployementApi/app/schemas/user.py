@@ -1,7 +1,7 @@
 """This will contain the schemas for user registration and output."""
 # pylint: disable=too-few-public-methods
 
-from typing import Optional
+from typing import List, Optional
 from pydantic import BaseModel, EmailStr
 
 from app.models.enums import UserRoleText
@@ -32,6 +32,13 @@ class UserOut(BaseModel):
         from_attributes = True  # Tells FastAPI how to read SQLAlchemy objects
 
 
+class Principal(BaseModel):
+    """Authenticated user built from the access token claims."""
+    id: int
+    email: str
+    user_role: Optional[int] = None  # e.g., "1=admin", "2=employer", "3=employee"
+
+
 class UserLogin(BaseModel):
     """Schema for user login."""
     username: str
@@ -56,3 +63,18 @@ class TokenResponse(BaseModel):
 class RefreshRequest(BaseModel):
     """Schema for refresh token request."""
     refresh_token: str
+
+
+class UserImportError(BaseModel):
+    """A row of an employee import that was not imported."""
+    line: int
+    email: Optional[str] = None
+    error: str
+
+
+class UserImportReport(BaseModel):
+    """Outcome of an employee import."""
+    total: int = 0
+    imported: int = 0
+    failed: int = 0
+    errors: List[UserImportError] = []
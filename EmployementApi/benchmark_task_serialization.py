@@ -0,0 +1,132 @@
+"""Benchmark the cost of serializing a page of tasks on each response path.
+
+Usage: python benchmark_task_serialization.py [--tasks 100] [--requests 1000] [--rounds 5]
+
+Every path serves the same prebuilt TasksResponse from a sync route, like
+/tasks/read_tasks, through the full FastAPI request handling (no database, no
+network), so the numbers only differ by how the response is validated and rendered.
+The best round of each path is reported. Without orjson installed the /orjson path
+is skipped, and /task_rows measures the stdlib json fallback of ModelResponse.
+"""
+import argparse
+import asyncio
+import json
+import time
+from datetime import datetime
+from fastapi import FastAPI
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, Response
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is optional, see app.core.responses
+    orjson = None
+
+from app.api.routes.tasks import TasksResponse, task_page_response
+from app.core.responses import ModelResponse
+from app.schemas.task import TaskRow, TaskUpdate
+
+
+def build_page(size: int) -> TasksResponse:
+    """Build a page of tasks shaped like the ones read_tasks returns."""
+    return TasksResponse(
+        success=True,
+        message="Task read successfully",
+        tasks=[TaskUpdate(
+            id=task_id,
+            title=f"Task {task_id}",
+            description="Prepare the quarterly report and share it with the team",
+            status="pending",
+            is_deleted=False,
+            assigned_to=3,
+            assigned_to_name="Jane Doe",
+            priority="normal",
+            due_date=datetime(2026, 1, 1, 12, 0),
+            assigned_by=1
+        ) for task_id in range(1, size + 1)],
+        next_cursor="eyJpZCI6MTAwfQ"
+    )
+
+
+def build_app(page: TasksResponse) -> FastAPI:
+    """Build an app serving the page on every response path."""
+    app = FastAPI()
+
+    @app.get("/stdlib_json")
+    def stdlib_json():
+        # No response_model: jsonable_encoder walks the model, then json.dumps
+        return JSONResponse(jsonable_encoder(page))
+
+    if orjson is not None:
+        @app.get("/orjson")
+        def orjson_dict():
+            # orjson renders the dict dumped by pydantic
+            return Response(orjson.dumps(page.model_dump()), media_type="application/json")
+
+    @app.get("/response_model", response_model=TasksResponse)
+    def response_model():
+        # Validated against response_model again on a worker thread, then dumped
+        return page
+
+    @app.get("/model_response", response_model=TasksResponse)
+    def model_response():
+        # Already the declared model, serialized once by pydantic-core
+        return ModelResponse(page)
+
+    rows = [TaskRow(**task.model_dump()) for task in page.tasks]
+
+    @app.get("/task_rows", response_model=TasksResponse)
+    def task_rows():
+        # List endpoint fast path: TaskRow dataclasses rendered by orjson, or stdlib json
+        return task_page_response(rows, page.next_cursor)
+
+    return app
+
+
+async def request(app: FastAPI, path: str) -> bytes:
+    """Send one GET request straight to the ASGI app and return the response body."""
+    scope = {"type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+             "method": "GET", "scheme": "http", "path": path, "raw_path": path.encode(),
+             "root_path": "", "query_string": b"", "headers": [],
+             "client": ("127.0.0.1", 1), "server": ("127.0.0.1", 80)}
+    body = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        if message["type"] == "http.response.body":
+            body.append(message.get("body", b""))
+
+    await app(scope, receive, send)
+    return b"".join(body)
+
+
+async def benchmark(size: int, requests: int, rounds: int):
+    """Print the time per request and response size of every path."""
+    app = build_app(build_page(size))
+    paths = ("/stdlib_json", "/orjson", "/response_model", "/model_response", "/task_rows")
+    if orjson is None:
+        paths = tuple(path for path in paths if path != "/orjson")
+    expected = json.loads(await request(app, paths[0]))
+    print(f"{size} tasks per page, best of {rounds} rounds of {requests} requests"
+          f"{'' if orjson is not None else ', orjson not installed'}")
+    for path in paths:
+        body = await request(app, path)
+        assert json.loads(body) == expected, f"{path} renders a different document"
+        best = float("inf")
+        for _ in range(rounds):
+            start = time.perf_counter()
+            for _ in range(requests):
+                await request(app, path)
+            best = min(best, (time.perf_counter() - start) / requests)
+        print(f"  {path:<16} {best * 1e6:9.1f} us/request  {len(body)} bytes")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tasks", type=int, default=100, help="tasks per page")
+    parser.add_argument("--requests", type=int, default=1000, help="requests per round")
+    parser.add_argument("--rounds", type=int, default=5, help="rounds per path")
+    args = parser.parse_args()
+    asyncio.run(benchmark(args.tasks, args.requests, args.rounds))
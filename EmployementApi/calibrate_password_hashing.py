@@ -0,0 +1,101 @@
+"""Measure password hashing on this host and pick the costs fitting a time budget per login.
+
+Usage: python calibrate_password_hashing.py [--target-ms 250] [--scheme bcrypt|argon2] [--samples 3]
+
+Run it on the production hardware. Hashes are timed through the same password context
+as the API (security.build_password_context), the most expensive costs within the budget
+are printed as the environment settings to deploy. Existing hashes are replaced with the
+new costs on the next successful login of each user.
+"""
+import argparse
+import statistics
+import time
+from app.core import security
+
+# Lowest costs ever suggested, even when they exceed the budget (OWASP recommendations)
+BCRYPT_MIN_ROUNDS = 10
+BCRYPT_MAX_ROUNDS = 20
+ARGON2_MIN_WORK = 19456 * 2  # 19 MiB over 2 passes
+ARGON2_MEMORY_COSTS = (19456, 32768, 47104, 65536, 131072, 262144)  # KiB
+ARGON2_MAX_TIME_COST = 10
+
+
+def time_hash(samples: int, **settings) -> float:
+    """Return the median time of a hash with the given context settings, in milliseconds."""
+    context = security.build_password_context(**settings)
+    context.hash("calibration")  # warm up the backend
+    times = []
+    for _ in range(samples):
+        start = time.perf_counter()
+        context.hash("calibration")
+        times.append((time.perf_counter() - start) * 1000)
+    return statistics.median(times)
+
+
+def calibrate_bcrypt(target_ms: float, samples: int) -> tuple[dict, float]:
+    """Return the greatest bcrypt rounds hashing within the target, with their time."""
+    best = None
+    for rounds in range(BCRYPT_MIN_ROUNDS, BCRYPT_MAX_ROUNDS + 1):
+        elapsed = time_hash(samples, scheme="bcrypt", bcrypt_rounds=rounds)
+        print(f"  rounds {rounds:2d}: {elapsed:8.1f} ms")
+        if best is not None and elapsed > target_ms:
+            break
+        best = ({"BCRYPT_ROUNDS": rounds}, elapsed)
+        if elapsed > target_ms:
+            break
+    return best
+
+
+def calibrate_argon2(target_ms: float, samples: int) -> tuple[dict, float]:
+    """Return the argon2id costs doing the most work within the target, with their time.
+
+    Work is memory times passes, ties go to more memory, which is costlier to attack.
+    """
+    best = best_work = None
+    for memory_cost in ARGON2_MEMORY_COSTS:
+        # Fewest passes reaching the minimum work
+        first_time_cost = max(1, -(-ARGON2_MIN_WORK // memory_cost))
+        for time_cost in range(first_time_cost, ARGON2_MAX_TIME_COST + 1):
+            elapsed = time_hash(samples, scheme="argon2", argon2_memory_cost=memory_cost,
+                                argon2_time_cost=time_cost, argon2_parallelism=1)
+            print(f"  memory {memory_cost:6d} KiB, time cost {time_cost:2d}: {elapsed:8.1f} ms")
+            work = memory_cost * time_cost
+            if best is None or elapsed <= target_ms and work >= best_work:
+                best_work = work
+                best = ({"ARGON2_MEMORY_COST": memory_cost, "ARGON2_TIME_COST": time_cost,
+                         "ARGON2_PARALLELISM": 1}, elapsed)
+            if elapsed > target_ms:
+                break
+        if elapsed > target_ms and time_cost == first_time_cost:
+            # More memory only takes longer
+            break
+    return best
+
+
+def main():
+    """Time the candidate costs and print the settings to deploy."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--target-ms", type=float, default=250,
+                        help="time budget of one hash, in milliseconds")
+    parser.add_argument("--scheme", choices=["bcrypt", "argon2"],
+                        default=security.PASSWORD_HASH_SCHEME, help="scheme of new hashes")
+    parser.add_argument("--samples", type=int, default=3, help="hashes timed per candidate")
+    args = parser.parse_args()
+
+    print(f"Timing {args.scheme} hashes, target {args.target_ms:g} ms")
+    if args.scheme == "argon2":
+        settings, elapsed = calibrate_argon2(args.target_ms, args.samples)
+    else:
+        settings, elapsed = calibrate_bcrypt(args.target_ms, args.samples)
+    if elapsed > args.target_ms:
+        print(f"Warning: the minimum costs take {elapsed:.1f} ms, over the target.")
+    workers = max(security.PASSWORD_HASH_WORKERS, 1)
+    print(f"\n{elapsed:.1f} ms per hash, about {workers * 1000 / elapsed:.0f} logins/s "
+          f"with {workers} hashing workers. Settings:")
+    print(f"PASSWORD_HASH_SCHEME={args.scheme}")
+    for name, value in settings.items():
+        print(f"{name}={value}")
+
+
+if __name__ == "__main__":
+    main()
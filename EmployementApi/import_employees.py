@@ -0,0 +1,38 @@
+"""Import employees from a CSV (with a header row) or JSONL file.
+
+Usage: python import_employees.py employees.csv [--format csv|jsonl] [--chunk-size 1000]
+
+CSV columns / JSON keys follow the /auth/register body: email, username, password,
+date_of_birth, employee_name, phone_number and optionally role.
+"""
+import argparse
+from app.core.security import shutdown_password_pool
+from app.crud.user_import import IMPORT_CHUNK_SIZE, import_users
+from app.db.session import SessionLocal
+
+
+def main():
+    """Stream the file into the users table and print the import report."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("path", help="CSV or JSONL file to import")
+    parser.add_argument("--format", choices=["csv", "jsonl"],
+                        help="file format, guessed from the extension by default")
+    parser.add_argument("--chunk-size", type=int, default=IMPORT_CHUNK_SIZE,
+                        help="rows validated, hashed and inserted together")
+    args = parser.parse_args()
+    file_format = args.format or ("jsonl" if args.path.endswith((".jsonl", ".ndjson")) else "csv")
+
+    db = SessionLocal()
+    try:
+        with open(args.path, encoding="utf-8-sig", newline="") as lines:
+            report = import_users(db, lines, file_format, chunk_size=args.chunk_size)
+    finally:
+        db.close()
+        shutdown_password_pool()
+    print(f"Imported {report.imported} of {report.total} rows, {report.failed} failed.")
+    for error in sorted(report.errors, key=lambda error: error.line):
+        print(f"  line {error.line} ({error.email}): {error.error}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""Task events pushed to the live streams of assignees, on a throwaway SQLite database."""
+import asyncio
+import os
+import tempfile
+
+os.environ.setdefault(
+    "DATABASE_URL", "sqlite:///" + os.path.join(tempfile.mkdtemp(), "test_task_events.db"))
+os.environ.setdefault("JWT_SECRET_KEY", os.urandom(32).hex())
+
+# pylint: disable=wrong-import-position
+import pytest
+from sqlalchemy import delete, insert
+from app.core import events
+from app.core.events import task_hub
+from app.crud import task as crud_task
+from app.db.session import Base, SessionLocal, engine
+from app.models.task import Task
+from app.models.user import User
+from app.schemas.task import TaskCreate, TaskUpdate
+
+OLD_ASSIGNEE, NEW_ASSIGNEE = 1, 2
+
+
+@pytest.fixture(name="db")
+def db_fixture():
+    """A session on a database holding two assignees and no task."""
+    Base.metadata.create_all(engine)
+    with SessionLocal() as db:
+        db.execute(delete(Task))
+        db.execute(delete(User))
+        db.execute(insert(User), [
+            {"id": user_id, "email": f"u{user_id}@example.com", "username": f"u{user_id}",
+             "full_name": f"User {user_id}", "employee_id": 10000 + user_id, "user_role": 3}
+            for user_id in (OLD_ASSIGNEE, NEW_ASSIGNEE)])
+        db.commit()
+        yield db
+
+
+def drain(subscription) -> list[str]:
+    """Return the event names queued for a subscription."""
+    names = []
+    while not subscription.queue.empty():
+        frame = subscription.queue.get_nowait()
+        names.append(frame.decode("utf-8").split("\n", 1)[0].removeprefix("event: "))
+    return names
+
+
+def reassign(db, update) -> tuple[list[str], list[str]]:
+    """Reassign a new task from OLD_ASSIGNEE with ``update``, return the events of both."""
+    task = crud_task.create_task(db, TaskCreate(title="Report", assigned_to=OLD_ASSIGNEE))
+
+    async def run():
+        old = task_hub.subscribe(OLD_ASSIGNEE)
+        new = task_hub.subscribe(NEW_ASSIGNEE)
+        try:
+            update(task.id)
+            # Published frames are handed over with call_soon_threadsafe
+            await asyncio.sleep(0)
+            return drain(old), drain(new)
+        finally:
+            task_hub.unsubscribe(old)
+            task_hub.unsubscribe(new)
+
+    return asyncio.run(run())
+
+
+def test_update_task_notifies_previous_assignee(db):
+    """A reassigned task is "removed" for its previous assignee and "updated" for the new."""
+    old_events, new_events = reassign(db, lambda task_id: crud_task.update_task(
+        db, task_id, TaskUpdate(id=task_id, assigned_to=NEW_ASSIGNEE), OLD_ASSIGNEE))
+    assert old_events == ["removed"]
+    assert new_events == ["updated"]
+
+
+def test_bulk_update_tasks_notifies_previous_assignee(db):
+    """Bulk reassignments notify the previous assignees like single ones."""
+    old_events, new_events = reassign(db, lambda task_id: crud_task.bulk_update_tasks(
+        db, [TaskUpdate(id=task_id, assigned_to=NEW_ASSIGNEE)], OLD_ASSIGNEE))
+    assert old_events == ["removed"]
+    assert new_events == ["updated"]
+
+
+def test_update_without_reassignment_only_notifies_assignee(db):
+    """Updates keeping the assignee send nothing else."""
+    old_events, new_events = reassign(db, lambda task_id: crud_task.update_task(
+        db, task_id, TaskUpdate(id=task_id, status="done"), OLD_ASSIGNEE))
+    assert old_events == ["updated"]
+    assert not new_events
+
+
+def test_stream_ends_once_no_longer_allowed(monkeypatch):
+    """The stream rechecks is_allowed on every keep-alive and ends when it fails."""
+    monkeypatch.setattr(events, "EVENT_KEEPALIVE_SECONDS", 0.01)
+    allowed = iter([True, False])
+
+    async def run():
+        return [frame async for frame in task_hub.stream(OLD_ASSIGNEE, lambda: next(allowed))]
+
+    assert asyncio.run(asyncio.wait_for(run(), 1)) == [events.KEEPALIVE_FRAME]
+    assert not task_hub.has_subscribers(OLD_ASSIGNEE)